@@ -1,13 +1,16 @@
 import streamlit as st
 import sys
 import os
-import tempfile
 import time
 from pathlib import Path
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 from app.resume_matcher import ResumeMatcher
 
+CACHE_DIR = os.environ.get('RESUME_CACHE_DIR', os.path.join(os.path.dirname(__file__), '.cache'))
+EMBEDDING_CACHE_PATH = os.path.join(CACHE_DIR, 'embeddings.sqlite3') if CACHE_DIR else None
+ENTITY_CACHE_PATH = os.path.join(CACHE_DIR, 'entities.sqlite3') if CACHE_DIR else None
+
 st.set_page_config(
     page_title="Resume Screening App",
     page_icon="📄",
@@ -398,7 +401,7 @@ def main():
     st.markdown('<div class="main-header"><h1>🎯 Resume Screening App</h1><p>AI-Powered Resume Matching with NLP</p></div>', unsafe_allow_html=True)
 
     if 'matcher' not in st.session_state:
-        st.session_state.matcher = ResumeMatcher()
+        st.session_state.matcher = ResumeMatcher(cache_path=EMBEDDING_CACHE_PATH, entity_cache_path=ENTITY_CACHE_PATH)
         st.session_state.resumes_processed = 0
 
     col1, col2 = st.columns([1, 1])
@@ -412,22 +415,33 @@ def main():
             help="Upload one or more resume files"
         )
 
-        if uploaded_files:
-            for uploaded_file in uploaded_files:
-                with st.spinner(f"Processing {uploaded_file.name}..."):
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-                        tmp_file.write(uploaded_file.getvalue())
-                        tmp_file_path = tmp_file.name
+        new_uploads = [
+            uploaded_file for uploaded_file in (uploaded_files or [])
+            if st.session_state.matcher.find_resume_by_content(uploaded_file.getvalue()) is None
+            and st.session_state.matcher.find_failure_by_content(uploaded_file.getvalue()) is None
+        ]
 
-                    result = st.session_state.matcher.add_resume_file(tmp_file_path)
-                    
-                    if result['success']:
-                        st.success(f"✅ {uploaded_file.name} processed successfully!")
-                        st.session_state.resumes_processed += 1
-                    else:
-                        st.error(f"❌ Error processing {uploaded_file.name}: {result['error']}")
-                    
-                    os.unlink(tmp_file_path)
+        if new_uploads:
+            progress_bar = st.progress(0.0, text=f"Processing {len(new_uploads)} file(s)...")
+
+            def report_progress(completed, total, file_result):
+                progress_bar.progress(completed / total, text=f"Processed {file_result['file_name']} ({completed}/{total})")
+
+            results = st.session_state.matcher.add_resume_uploads(
+                [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in new_uploads],
+                progress_callback=report_progress
+            )
+            progress_bar.empty()
+
+            for result in results:
+                file_name = result['file_name']
+                if result.get('duplicate'):
+                    st.info(f"ℹ️ {file_name} was already processed")
+                elif result['success']:
+                    st.success(f"✅ {file_name} processed successfully!")
+                    st.session_state.resumes_processed += 1
+                else:
+                    st.error(f"❌ Error processing {file_name}: {result['error']}")
 
     with col2:
         st.markdown("### 📊 Statistics")
@@ -1,8 +1,16 @@
 from .document_parser import DocumentParser
 from .embedding_system import EmbeddingSystem
+from .embedding_index import EmbeddingIndex
+from .ann_index import IVFIndex
+from .embedding_cache import LRUEmbeddingCache, PersistentEmbeddingCache
+from .entity_cache import PersistentEntityCache
 from .resume_processor import ResumeProcessor
 from .matching_engine import MatchingEngine
 from .resume_matcher import ResumeMatcher
 from .ner_extractor import NERExtractor
+from .model_registry import ModelRegistry, default_registry
+from .skill_matcher import SkillMatcher, load_skill_taxonomy
+from .ingest_trace import IngestTrace
+from .dataset_loader import iter_csv_chunks, iter_jobs, iter_resume_records
 
-__all__ = ['DocumentParser', 'EmbeddingSystem', 'ResumeProcessor', 'MatchingEngine', 'ResumeMatcher', 'NERExtractor', 'AdvancedAnalytics'] 
\ No newline at end of file
+__all__ = ['DocumentParser', 'EmbeddingSystem', 'EmbeddingIndex', 'IVFIndex', 'LRUEmbeddingCache', 'PersistentEmbeddingCache', 'PersistentEntityCache', 'ResumeProcessor', 'MatchingEngine', 'ResumeMatcher', 'NERExtractor', 'ModelRegistry', 'default_registry', 'SkillMatcher', 'load_skill_taxonomy', 'iter_csv_chunks', 'iter_resume_records', 'iter_jobs', 'IngestTrace', 'AdvancedAnalytics'] 
\ No newline at end of file
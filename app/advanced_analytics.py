@@ -141,6 +141,9 @@ class AdvancedAnalytics:
         }
     
     def _extract_years_experience(self, resume_text: str, entities: Dict) -> float:
+        if entities.get('experience_years') is not None:
+            return float(entities['experience_years'])
+        
         dates = entities.get('work_experience', {}).get('dates', [])
         
         if not dates:
@@ -0,0 +1,186 @@
+import numpy as np
+from typing import Dict, Optional
+
+class IVFIndex:
+    def __init__(self, nlist: int = 1024, nprobe: int = 16, train_threshold: Optional[int] = None,
+                 max_train_points: Optional[int] = None, n_iter: int = 20, seed: int = 0):
+        self.max_nlist = nlist
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold if train_threshold is not None else nlist * 39
+        self.max_train_points = max_train_points if max_train_points is not None else nlist * 256
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = None
+        self.clear()
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+    
+    def should_train(self, size: int) -> bool:
+        return not self.is_trained and size >= self.train_threshold
+    
+    def reset(self):
+        self.centroids = None
+        self.nlist = self.max_nlist
+        self.clear()
+    
+    def clear(self):
+        self.lists = [np.zeros(16, dtype=np.int64) for _ in range(self.nlist)]
+        self.counts = np.zeros(self.nlist, dtype=np.int64)
+        self.row_cluster = np.full(1024, -1, dtype=np.int64)
+        self.row_position = np.zeros(1024, dtype=np.int64)
+    
+    def _ensure_rows(self, size: int):
+        if size <= self.row_cluster.shape[0]:
+            return
+        
+        capacity = max(size, self.row_cluster.shape[0] * 2)
+        row_cluster = np.full(capacity, -1, dtype=np.int64)
+        row_cluster[:self.row_cluster.shape[0]] = self.row_cluster
+        row_position = np.zeros(capacity, dtype=np.int64)
+        row_position[:self.row_position.shape[0]] = self.row_position
+        self.row_cluster = row_cluster
+        self.row_position = row_position
+    
+    def _append(self, cluster: int, row: int):
+        count = self.counts[cluster]
+        if count == self.lists[cluster].shape[0]:
+            grown = np.zeros(count * 2, dtype=np.int64)
+            grown[:count] = self.lists[cluster]
+            self.lists[cluster] = grown
+        
+        self.lists[cluster][count] = row
+        self.counts[cluster] = count + 1
+        self.row_cluster[row] = cluster
+        self.row_position[row] = count
+    
+    def _assign(self, vectors: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        assignments = np.empty(vectors.shape[0], dtype=np.int64)
+        for start in range(0, vectors.shape[0], chunk_size):
+            chunk = vectors[start:start + chunk_size]
+            assignments[start:start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignments
+    
+    def train(self, vectors: np.ndarray):
+        rng = np.random.default_rng(self.seed)
+        size = vectors.shape[0]
+        if size == 0:
+            return
+        
+        nlist = min(self.max_nlist, size)
+        sample = vectors
+        if size > self.max_train_points:
+            sample = vectors[np.sort(rng.choice(size, self.max_train_points, replace=False))]
+        
+        centroids = sample[rng.choice(sample.shape[0], nlist, replace=False)].copy()
+        for _ in range(self.n_iter):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            
+            empty = np.flatnonzero(np.bincount(assignments, minlength=nlist) == 0)
+            if empty.size:
+                sums[empty] = sample[rng.choice(sample.shape[0], empty.size, replace=False)]
+            
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.where(norms == 0, 1, norms)
+        
+        self.nlist = nlist
+        self.centroids = centroids.astype(np.float32)
+        self._rebuild(self._assign(vectors))
+    
+    def _rebuild(self, row_cluster: np.ndarray):
+        self.clear()
+        self._ensure_rows(row_cluster.shape[0])
+        
+        rows = np.flatnonzero(row_cluster >= 0)
+        clusters = row_cluster[rows]
+        order = np.argsort(clusters, kind='stable')
+        rows, clusters = rows[order], clusters[order]
+        
+        self.counts = np.bincount(clusters, minlength=self.nlist).astype(np.int64)
+        starts = np.cumsum(self.counts) - self.counts
+        self.row_cluster[rows] = clusters
+        self.row_position[rows] = np.arange(rows.shape[0]) - starts[clusters]
+        self.lists = [
+            np.concatenate((rows[start:start + count], np.zeros(max(16, count), dtype=np.int64)))
+            for start, count in zip(starts, self.counts)
+        ]
+    
+    def add_row(self, row: int, vector: np.ndarray):
+        if not self.is_trained:
+            return
+        
+        self._ensure_rows(row + 1)
+        self._append(int(np.argmax(self.centroids @ vector)), row)
+    
+    def remove_row(self, row: int):
+        if row >= self.row_cluster.shape[0] or self.row_cluster[row] < 0:
+            return
+        
+        cluster = self.row_cluster[row]
+        position = self.row_position[row]
+        last = self.counts[cluster] - 1
+        moved = self.lists[cluster][last]
+        self.lists[cluster][position] = moved
+        self.row_position[moved] = position
+        self.counts[cluster] = last
+        self.row_cluster[row] = -1
+    
+    def move_row(self, source: int, target: int):
+        if source >= self.row_cluster.shape[0] or self.row_cluster[source] < 0:
+            return
+        
+        self._ensure_rows(target + 1)
+        cluster = self.row_cluster[source]
+        position = self.row_position[source]
+        self.lists[cluster][position] = target
+        self.row_cluster[target] = cluster
+        self.row_position[target] = position
+        self.row_cluster[source] = -1
+    
+    def candidate_rows(self, query_vector: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        centroid_scores = self.centroids @ query_vector
+        if nprobe < self.nlist:
+            probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probes = np.arange(self.nlist)
+        return np.concatenate([self.lists[cluster][:self.counts[cluster]] for cluster in probes])
+    
+    def state(self, size: int) -> Dict[str, np.ndarray]:
+        config = np.array([self.max_nlist, self.nprobe, self.train_threshold, self.max_train_points, self.n_iter, self.seed])
+        if not self.is_trained:
+            return {'config': config}
+        
+        self._ensure_rows(size)
+        return {
+            'config': config,
+            'centroids': self.centroids,
+            'row_cluster': self.row_cluster[:size]
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray]) -> 'IVFIndex':
+        nlist, nprobe, train_threshold, max_train_points, n_iter, seed = (int(value) for value in state['config'])
+        ann = cls(nlist, nprobe, train_threshold, max_train_points, n_iter, seed)
+        
+        if 'centroids' in state:
+            ann.centroids = np.asarray(state['centroids'], dtype=np.float32)
+            ann.nlist = ann.centroids.shape[0]
+            ann._rebuild(np.asarray(state['row_cluster'], dtype=np.int64))
+        
+        return ann
+    
+    def get_stats(self) -> Dict:
+        counts = self.counts[:self.nlist]
+        return {
+            'trained': self.is_trained,
+            'nlist': self.nlist,
+            'nprobe': self.nprobe,
+            'indexed_rows': int(counts.sum()),
+            'largest_list': int(counts.max()) if self.is_trained else 0,
+            'empty_lists': int((counts == 0).sum()) if self.is_trained else 0
+        }
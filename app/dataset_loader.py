@@ -0,0 +1,67 @@
+import csv
+import os
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+def split_list_field(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+def parse_years(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def iter_csv_rows(path: str, encoding: str = 'utf-8') -> Iterator[Dict[str, str]]:
+    with open(path, newline='', encoding=encoding) as file:
+        yield from csv.DictReader(file)
+
+def iter_csv_chunks(path: str, chunk_size: int = 500, encoding: str = 'utf-8') -> Iterator[List[Dict[str, str]]]:
+    rows = iter_csv_rows(path, encoding)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def resume_record(row: Dict[str, str], id_prefix: str = '') -> Optional[Dict]:
+    text = (row.get('text') or '').strip()
+    if not text:
+        return None
+    
+    metadata = {
+        'skills': split_list_field(row.get('skills')),
+        'experience_years': parse_years(row.get('experience_years')),
+        'location': (row.get('location') or '').strip() or None
+    }
+    for column in ('filename', 'category', 'education'):
+        if row.get(column):
+            metadata[column] = row[column].strip()
+    
+    return {
+        'resume_id': f"{id_prefix}{row['id']}" if row.get('id') else None,
+        'text': text,
+        'metadata': metadata
+    }
+
+def iter_resume_records(path: str, chunk_size: int = 500, encoding: str = 'utf-8') -> Iterator[List[Dict]]:
+    id_prefix = os.path.splitext(os.path.basename(path))[0] + ':'
+    for chunk in iter_csv_chunks(path, chunk_size, encoding):
+        records = [resume_record(row, id_prefix) for row in chunk]
+        yield [record for record in records if record is not None]
+
+def job_record(row: Dict[str, str]) -> Dict:
+    return {
+        'job_id': row.get('id'),
+        'title': (row.get('title') or '').strip(),
+        'company': (row.get('company') or '').strip(),
+        'location': (row.get('location') or '').strip() or None,
+        'experience_required': (row.get('experience_required') or '').strip(),
+        'skills_required': split_list_field(row.get('skills_required')),
+        'salary_range': (row.get('salary_range') or '').strip(),
+        'description': (row.get('description') or '').strip()
+    }
+
+def iter_jobs(path: str, encoding: str = 'utf-8') -> Iterator[Dict]:
+    for row in iter_csv_rows(path, encoding):
+        yield job_record(row)
@@ -1,14 +1,199 @@
+import io
+import multiprocessing
 import os
+import signal
+import time
 import PyPDF2
 import docx
 import re
-from typing import Dict, List, Optional, Tuple
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from .ingest_trace import IngestTrace
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+MEMORY_LIMIT_ERROR = "Document exceeded the parser memory limit"
+
+_CLEAN_RUN_RE = re.compile(r'[^\w.,!?;:()\-]{2,}|[^\w.,!?;:()\- \n]')
+_CONTAINS_WHITESPACE = re.compile(r'\s').search
+
+SECTION_HEADERS = (
+    ('experience', ('experience', 'work history', 'employment')),
+    ('education', ('education', 'academic', 'degree')),
+    ('skills', ('skills', 'technologies', 'programming'))
+)
+SECTION_NAMES = ('summary',) + tuple(section for section, _ in SECTION_HEADERS)
+
+_SECTION_HEADER_RE = re.compile(
+    '|'.join(f"(?P<{section}>{'|'.join(map(re.escape, keywords))})" for section, keywords in SECTION_HEADERS),
+    re.IGNORECASE
+)
+_SECTION_PRIORITY = {section: rank for rank, (section, _) in enumerate(SECTION_HEADERS)}
+_LINE_RE = re.compile(r'[^\S\n]*(\S(?:[^\n]*\S)?)')
+
+class DocumentSections(Mapping):
+    def __init__(self, text: str, spans: Dict[str, List[Tuple[int, int]]]):
+        self.text = text
+        self.spans = spans
+    
+    def __getitem__(self, section: str) -> str:
+        if section == 'full_text':
+            return self.text.strip()
+        return '\n'.join(self.text[start:end] for start, end in self.spans[section])
+    
+    def __iter__(self):
+        yield 'full_text'
+        yield from self.spans
+    
+    def __len__(self) -> int:
+        return len(self.spans) + 1
+    
+    def __repr__(self) -> str:
+        return f"DocumentSections({dict(self)!r})"
+
+def _clean_run(match) -> str:
+    run = match.group()
+    if '\n' in run or '\r' in run:
+        return '\n'
+    if _CONTAINS_WHITESPACE(run):
+        return ' '
+    return ''
+
+def _extract_pdf_page_range(data: bytes, start: int, stop: int) -> List[str]:
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [pdf_reader.pages[page_number].extract_text() or '' for page_number in range(start, stop)]
+
+def _address_space_bytes() -> int:
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def _guarded_parse_worker(connection, parser: 'DocumentParser', source: Union[str, bytes],
+                          file_extension: Optional[str], memory_limit_mb: Optional[int]):
+    trace = IngestTrace()
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    
+    if memory_limit_mb and resource is not None:
+        limit = _address_space_bytes() + memory_limit_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+    
+    try:
+        if isinstance(source, str):
+            success, result = parser.parse_document(source, trace)
+        else:
+            success, result = parser.parse_bytes(source, file_extension, trace)
+        connection.send((success, result, trace.stages, trace.details))
+    except MemoryError:
+        connection.send((False, MEMORY_LIMIT_ERROR, trace.stages, trace.details))
+    finally:
+        connection.close()
 
 class DocumentParser:
-    def __init__(self):
+    def __init__(self, max_pages: Optional[int] = 5, page_workers: int = 0, parallel_page_threshold: int = 8,
+                 timeout: Optional[float] = 30.0, memory_limit_mb: Optional[int] = 1024):
         self.supported_extensions = {'.pdf', '.docx', '.doc'}
+        self.max_pages = max_pages
+        self.page_workers = page_workers
+        self.parallel_page_threshold = parallel_page_threshold
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
     
-    def parse_document(self, file_path: str) -> Tuple[bool, str]:
+    @property
+    def isolated(self) -> bool:
+        return self.timeout is not None or self.memory_limit_mb is not None
+    
+    def parse_guarded(self, source: Union[str, bytes], file_extension: Optional[str] = None,
+                      trace: Optional[IngestTrace] = None) -> Dict:
+        trace = trace or IngestTrace()
+        if isinstance(source, str):
+            if not os.path.exists(source):
+                return {'success': False, 'text': None, 'error': "File does not exist", 'reason': 'not_found'}
+            file_extension = os.path.splitext(source)[1]
+        
+        file_extension = self._normalize_extension(file_extension or '')
+        if file_extension not in self.supported_extensions:
+            return {'success': False, 'text': None, 'error': f"Unsupported file format: {file_extension}",
+                    'reason': 'unsupported_format'}
+        
+        if not self.isolated:
+            if isinstance(source, str):
+                success, result = self.parse_document(source, trace)
+            else:
+                success, result = self.parse_bytes(source, file_extension, trace)
+            return self._guarded_result(success, result, trace)
+        
+        started = time.perf_counter()
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else multiprocessing.get_context()
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_guarded_parse_worker,
+            args=(sender, self, source, file_extension, self.memory_limit_mb)
+        )
+        process.start()
+        sender.close()
+        
+        try:
+            if not receiver.poll(self.timeout):
+                self._kill(process)
+                trace.record('parse', time.perf_counter() - started)
+                return {'success': False, 'text': None, 'error': f"Parsing timed out after {self.timeout} seconds",
+                        'reason': 'timeout'}
+            success, result, stages, details = receiver.recv()
+        except EOFError:
+            process.join()
+            trace.record('parse', time.perf_counter() - started)
+            if process.exitcode == -getattr(signal, 'SIGKILL', 9):
+                return {'success': False, 'text': None, 'error': MEMORY_LIMIT_ERROR, 'reason': 'memory_limit'}
+            return {'success': False, 'text': None, 'error': f"Parser process exited with code {process.exitcode}",
+                    'reason': 'crashed'}
+        finally:
+            receiver.close()
+        
+        process.join(1)
+        if process.is_alive():
+            self._kill(process)
+        
+        trace.merge(stages)
+        trace.details.update(details)
+        trace.record('isolation', max(0.0, time.perf_counter() - started - sum(stages.values())))
+        return self._guarded_result(success, result, trace)
+    
+    def _guarded_result(self, success: bool, result: str, trace: IngestTrace) -> Dict:
+        if success:
+            pages = {name: trace.details[name] for name in ('pages_total', 'pages_parsed') if name in trace.details}
+            return dict({'success': True, 'text': result, 'error': None, 'reason': None}, **pages)
+        if result == MEMORY_LIMIT_ERROR:
+            return {'success': False, 'text': None, 'error': result, 'reason': 'memory_limit'}
+        return {'success': False, 'text': None, 'error': result, 'reason': 'parse_error'}
+    
+    def _kill(self, process):
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            process.kill()
+        process.join()
+    
+    def _normalize_extension(self, file_extension: str) -> str:
+        file_extension = file_extension.lower()
+        if file_extension and not file_extension.startswith('.'):
+            file_extension = '.' + file_extension
+        return file_extension
+    
+    def parse_document(self, file_path: str, trace: Optional[IngestTrace] = None) -> Tuple[bool, str]:
+        trace = trace or IngestTrace()
         if not os.path.exists(file_path):
             return False, "File does not exist"
         
@@ -17,98 +202,153 @@ class DocumentParser:
         if file_extension not in self.supported_extensions:
             return False, f"Unsupported file format: {file_extension}"
         
+        try:
+            with trace.stage('read'):
+                with open(file_path, 'rb') as file:
+                    stream = io.BytesIO(file.read())
+            
+            if file_extension == '.pdf':
+                return self._parse_pdf(stream, trace)
+            elif file_extension in ['.docx', '.doc']:
+                return self._parse_docx(stream, trace)
+        except MemoryError:
+            raise
+        except Exception as e:
+            return False, f"Error parsing document: {str(e)}"
+    
+    def parse_bytes(self, data: Union[bytes, BinaryIO], file_extension: str,
+                    trace: Optional[IngestTrace] = None) -> Tuple[bool, str]:
+        trace = trace or IngestTrace()
+        file_extension = self._normalize_extension(file_extension)
+        
+        if file_extension not in self.supported_extensions:
+            return False, f"Unsupported file format: {file_extension}"
+        
+        stream = io.BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        
         try:
             if file_extension == '.pdf':
-                return self._parse_pdf(file_path)
+                return self._parse_pdf(stream, trace)
             elif file_extension in ['.docx', '.doc']:
-                return self._parse_docx(file_path)
+                return self._parse_docx(stream, trace)
+        except MemoryError:
+            raise
         except Exception as e:
             return False, f"Error parsing document: {str(e)}"
     
-    def _parse_pdf(self, file_path: str) -> Tuple[bool, str]:
+    def _parse_pdf(self, source: Union[str, BinaryIO], trace: Optional[IngestTrace] = None) -> Tuple[bool, str]:
+        trace = trace or IngestTrace()
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
+            with trace.stage('parse'):
+                pdf_reader = PyPDF2.PdfReader(source)
                 
-                if len(pdf_reader.pages) == 0:
+                pages_total = len(pdf_reader.pages)
+                if pages_total == 0:
                     return False, "PDF file is empty"
                 
-                text_content = []
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text_content.append(page_text)
-                
-                if not text_content:
-                    return False, "No text content found in PDF"
+                trace.annotate('pages_total', pages_total)
+                trace.annotate('pages_parsed', pages_total if self.max_pages is None else min(pages_total, self.max_pages))
                 
-                full_text = '\n'.join(text_content)
+                full_text = '\n'.join(
+                    page_text for page_text in self.iter_pdf_pages(source, pdf_reader) if page_text.strip()
+                )
+            
+            if not full_text:
+                return False, "No text content found in PDF"
+            
+            with trace.stage('clean'):
                 cleaned_text = self._clean_text(full_text)
+            
+            return True, cleaned_text
                 
-                return True, cleaned_text
-                
+        except MemoryError:
+            raise
         except Exception as e:
             return False, f"PDF parsing error: {str(e)}"
     
-    def _parse_docx(self, file_path: str) -> Tuple[bool, str]:
+    def iter_pdf_pages(self, source: Union[str, BinaryIO], pdf_reader: Optional[PyPDF2.PdfReader] = None) -> Iterator[str]:
+        pdf_reader = pdf_reader or PyPDF2.PdfReader(source)
+        
+        page_count = len(pdf_reader.pages)
+        if self.max_pages is not None:
+            page_count = min(page_count, self.max_pages)
+        
+        if self.page_workers > 1 and page_count >= self.parallel_page_threshold:
+            yield from self._iter_pdf_pages_parallel(self._read_source(source), page_count)
+            return
+        
+        for page_number in range(page_count):
+            yield pdf_reader.pages[page_number].extract_text() or ''
+    
+    def _iter_pdf_pages_parallel(self, data: bytes, page_count: int) -> Iterator[str]:
+        chunk_size = max(1, -(-page_count // self.page_workers))
+        ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+        
+        with ProcessPoolExecutor(max_workers=self.page_workers) as executor:
+            futures = [executor.submit(_extract_pdf_page_range, data, start, stop) for start, stop in ranges]
+            for future in futures:
+                yield from future.result()
+    
+    def _read_source(self, source: Union[str, BinaryIO]) -> bytes:
+        if isinstance(source, str):
+            with open(source, 'rb') as file:
+                return file.read()
+        
+        source.seek(0)
+        return source.read()
+    
+    def _parse_docx(self, source: Union[str, BinaryIO], trace: Optional[IngestTrace] = None) -> Tuple[bool, str]:
+        trace = trace or IngestTrace()
         try:
-            doc = docx.Document(file_path)
-            
-            if not doc.paragraphs:
-                return False, "DOCX file is empty"
-            
-            text_content = []
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_content.append(paragraph.text)
+            with trace.stage('parse'):
+                doc = docx.Document(source)
+                
+                if not doc.paragraphs:
+                    return False, "DOCX file is empty"
+                
+                text_content = []
+                for paragraph in doc.paragraphs:
+                    if paragraph.text.strip():
+                        text_content.append(paragraph.text)
             
             if not text_content:
                 return False, "No text content found in DOCX"
             
             full_text = '\n'.join(text_content)
-            cleaned_text = self._clean_text(full_text)
+            with trace.stage('clean'):
+                cleaned_text = self._clean_text(full_text)
             
             return True, cleaned_text
             
+        except MemoryError:
+            raise
         except Exception as e:
             return False, f"DOCX parsing error: {str(e)}"
     
     def _clean_text(self, text: str) -> str:
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)]', '', text)
-        text = text.strip()
-        return text
-    
-    def extract_sections(self, text: str) -> Dict[str, str]:
-        sections = {
-            'full_text': text,
-            'summary': '',
-            'experience': '',
-            'education': '',
-            'skills': ''
-        }
-        
-        lines = text.split('\n')
+        return _CLEAN_RUN_RE.sub(_clean_run, text).strip()
+    
+    def extract_sections(self, text: str) -> 'DocumentSections':
+        return DocumentSections(text, self.extract_section_spans(text))
+    
+    def extract_section_spans(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        spans = {section: [] for section in SECTION_NAMES}
         current_section = 'summary'
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        for line in _LINE_RE.finditer(text):
+            start, end = line.span(1)
             
-            line_lower = line.lower()
+            header = _SECTION_HEADER_RE.search(text, start, end)
+            if header:
+                current_section = min(
+                    (match.lastgroup for match in _SECTION_HEADER_RE.finditer(text, header.start(), end)),
+                    key=_SECTION_PRIORITY.get
+                )
             
-            if any(keyword in line_lower for keyword in ['experience', 'work history', 'employment']):
-                current_section = 'experience'
-            elif any(keyword in line_lower for keyword in ['education', 'academic', 'degree']):
-                current_section = 'education'
-            elif any(keyword in line_lower for keyword in ['skills', 'technologies', 'programming']):
-                current_section = 'skills'
-            
-            if current_section in sections:
-                sections[current_section] += line + '\n'
-        
-        for key in sections:
-            sections[key] = sections[key].strip()
+            section_spans = spans[current_section]
+            if section_spans and section_spans[-1][1] + 1 == start:
+                section_spans[-1] = (section_spans[-1][0], end)
+            else:
+                section_spans.append((start, end))
         
-        return sections 
\ No newline at end of file
+        return spans
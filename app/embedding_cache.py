@@ -0,0 +1,152 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+def normalize_text(text: str) -> str:
+    return ' '.join(text.split())
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+class LRUEmbeddingCache:
+    def __init__(self, max_memory_mb: float = 256):
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def _entry_size(self, key: str, vector: np.ndarray) -> int:
+        return sys.getsizeof(key) + vector.nbytes
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        vector = self._entries.get(key)
+        if vector is None:
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return vector
+    
+    def put(self, key: str, vector: np.ndarray):
+        vector = np.asarray(vector)
+        size = self._entry_size(key, vector)
+        if size > self.max_bytes:
+            return
+        
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= self._entry_size(key, previous)
+        
+        self._entries[key] = vector
+        self.current_bytes += size
+        
+        while self.current_bytes > self.max_bytes:
+            evicted_key, evicted_vector = self._entries.popitem(last=False)
+            self.current_bytes -= self._entry_size(evicted_key, evicted_vector)
+            self.evictions += 1
+    
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+    
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'memory_bytes': self.current_bytes,
+            'memory_limit_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+class PersistentEmbeddingCache:
+    def __init__(self, db_path: str, max_query_params: int = 500):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        
+        self.db_path = db_path
+        self.max_query_params = max_query_params
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS embeddings ('
+            'model_name TEXT NOT NULL, '
+            'text_hash TEXT NOT NULL, '
+            'dimension INTEGER NOT NULL, '
+            'vector BLOB NOT NULL, '
+            'PRIMARY KEY (model_name, text_hash))'
+        )
+        self._connection.commit()
+    
+    def get(self, model_name: str, key: str) -> Optional[np.ndarray]:
+        return self.get_many(model_name, [key]).get(key)
+    
+    def get_many(self, model_name: str, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        
+        with self._lock:
+            for start in range(0, len(keys), self.max_query_params):
+                chunk = keys[start:start + self.max_query_params]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._connection.execute(
+                    f'SELECT text_hash, vector FROM embeddings WHERE model_name = ? AND text_hash IN ({placeholders})',
+                    [model_name] + chunk
+                ).fetchall()
+                
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        
+        return found
+    
+    def put(self, model_name: str, key: str, vector: np.ndarray):
+        self.put_many(model_name, {key: vector})
+    
+    def put_many(self, model_name: str, vectors: Dict[str, np.ndarray]):
+        if not vectors:
+            return
+        
+        rows = []
+        for key, vector in vectors.items():
+            vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+            rows.append((model_name, key, vector.shape[0], vector.tobytes()))
+        
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO embeddings (model_name, text_hash, dimension, vector) VALUES (?, ?, ?, ?)',
+                rows
+            )
+            self._connection.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+    
+    def clear(self, model_name: Optional[str] = None):
+        with self._lock:
+            if model_name is None:
+                self._connection.execute('DELETE FROM embeddings')
+            else:
+                self._connection.execute('DELETE FROM embeddings WHERE model_name = ?', (model_name,))
+            self._connection.commit()
+    
+    def close(self):
+        with self._lock:
+            self._connection.close()
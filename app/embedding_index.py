@@ -0,0 +1,347 @@
+import time
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from .ann_index import IVFIndex
+
+def select_top_k(scores: np.ndarray, top_k: int, min_score: Optional[float] = None,
+                 exclude: Optional[np.ndarray] = None) -> np.ndarray:
+    scores = np.asarray(scores)
+    keep = None
+    
+    if exclude is not None:
+        keep = ~np.asarray(exclude, dtype=bool)
+    if min_score is not None:
+        above = scores >= min_score
+        keep = above if keep is None else keep & above
+    
+    if keep is None:
+        candidates = np.arange(scores.shape[0])
+        values = scores
+    else:
+        candidates = np.flatnonzero(keep)
+        values = scores[candidates]
+    
+    k = min(top_k, values.shape[0])
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    if k < values.shape[0]:
+        winners = np.argpartition(-values, k - 1)[:k]
+    else:
+        winners = np.arange(values.shape[0])
+    
+    winners = winners[np.argsort(-values[winners], kind='stable')]
+    return candidates[winners]
+
+def npz_path(path: str) -> str:
+    return path if path.endswith('.npz') else path + '.npz'
+
+class EmbeddingIndex:
+    def __init__(self, dimension: Optional[int] = None, initial_capacity: int = 1024,
+                 section_names: Iterable[str] = (), ann: Optional[IVFIndex] = None):
+        self.dimension = dimension
+        self.ann = ann
+        self.initial_capacity = max(1, initial_capacity)
+        self.section_names = tuple(section_names)
+        self.section_channels = {name: channel for channel, name in enumerate(self.section_names)}
+        self.matrix = None
+        self.section_matrix = None
+        self.section_mask = None
+        self.ids = []
+        self.id_to_row = {}
+        
+        if dimension is not None:
+            self._allocate(dimension)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.id_to_row
+    
+    def _allocate(self, dimension: int):
+        self.dimension = dimension
+        self.matrix = np.zeros((self.initial_capacity, dimension), dtype=np.float32)
+        self.section_matrix = np.zeros((len(self.section_names), self.initial_capacity, dimension), dtype=np.float32)
+        self.section_mask = np.zeros((len(self.section_names), self.initial_capacity), dtype=bool)
+    
+    def _grow(self):
+        size = len(self.ids)
+        capacity = self.matrix.shape[0] * 2
+        
+        grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+        grown[:size] = self.matrix[:size]
+        self.matrix = grown
+        
+        grown_sections = np.zeros((len(self.section_names), capacity, self.dimension), dtype=np.float32)
+        grown_sections[:, :size] = self.section_matrix[:, :size]
+        self.section_matrix = grown_sections
+        
+        grown_mask = np.zeros((len(self.section_names), capacity), dtype=bool)
+        grown_mask[:, :size] = self.section_mask[:, :size]
+        self.section_mask = grown_mask
+    
+    @staticmethod
+    def normalize(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return vector
+        return vector / norm
+    
+    def add(self, item_id: str, vector: np.ndarray, section_vectors: Optional[Dict[str, np.ndarray]] = None):
+        vector = self.normalize(vector)
+        
+        if self.matrix is None:
+            self._allocate(vector.shape[0])
+        elif vector.shape[0] != self.dimension:
+            raise ValueError(f"Expected vector of dimension {self.dimension}, got {vector.shape[0]}")
+        
+        row = self.id_to_row.get(item_id)
+        if row is None:
+            if len(self.ids) == self.matrix.shape[0]:
+                self._grow()
+            
+            row = len(self.ids)
+            self.ids.append(item_id)
+            self.id_to_row[item_id] = row
+        elif self.ann is not None:
+            self.ann.remove_row(row)
+        
+        self.matrix[row] = vector
+        self._set_sections(row, section_vectors or {})
+        
+        if self.ann is not None:
+            self.ann.add_row(row, vector)
+            if self.ann.should_train(len(self.ids)):
+                self.ann.train(self.vectors())
+    
+    def _set_sections(self, row: int, section_vectors: Dict[str, np.ndarray]):
+        self.section_matrix[:, row] = 0
+        self.section_mask[:, row] = False
+        
+        for name, section_vector in section_vectors.items():
+            channel = self.section_channels.get(name)
+            if channel is None:
+                continue
+            
+            section_vector = self.normalize(section_vector)
+            if section_vector.shape[0] != self.dimension:
+                raise ValueError(f"Expected vector of dimension {self.dimension}, got {section_vector.shape[0]}")
+            self.section_matrix[channel, row] = section_vector
+            self.section_mask[channel, row] = True
+    
+    def remove(self, item_id: str) -> bool:
+        row = self.id_to_row.pop(item_id, None)
+        if row is None:
+            return False
+        
+        last_row = len(self.ids) - 1
+        if self.ann is not None:
+            self.ann.remove_row(row)
+            if row != last_row:
+                self.ann.move_row(last_row, row)
+        
+        if row != last_row:
+            last_id = self.ids[last_row]
+            self.matrix[row] = self.matrix[last_row]
+            self.section_matrix[:, row] = self.section_matrix[:, last_row]
+            self.section_mask[:, row] = self.section_mask[:, last_row]
+            self.ids[row] = last_id
+            self.id_to_row[last_id] = row
+        
+        self.matrix[last_row] = 0
+        self.section_matrix[:, last_row] = 0
+        self.section_mask[:, last_row] = False
+        self.ids.pop()
+        return True
+    
+    def get_vector(self, item_id: str) -> Optional[np.ndarray]:
+        row = self.id_to_row.get(item_id)
+        if row is None:
+            return None
+        return self.matrix[row]
+    
+    def get_section_vectors(self, item_id: str) -> Dict[str, np.ndarray]:
+        row = self.id_to_row.get(item_id)
+        if row is None:
+            return {}
+        
+        present = self.section_mask[:, row]
+        return {name: self.section_matrix[channel, row] for channel, name in enumerate(self.section_names) if present[channel]}
+    
+    def vectors(self) -> np.ndarray:
+        if self.matrix is None:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return self.matrix[:len(self.ids)]
+    
+    def scores(self, query_vector: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if not self.ids:
+            return np.zeros(0, dtype=np.float32)
+        if rows is None:
+            return self.vectors() @ self.normalize(query_vector)
+        return self.matrix[rows] @ self.normalize(query_vector)
+    
+    def section_scores(self, item_id: str, query_vector: np.ndarray) -> Dict[str, float]:
+        row = self.id_to_row.get(item_id)
+        if row is None:
+            return {}
+        
+        scores = self.section_matrix[:, row] @ self.normalize(query_vector)
+        present = self.section_mask[:, row]
+        return {name: float(scores[channel]) for channel, name in enumerate(self.section_names) if present[channel]}
+    
+    def weighted_scores(self, query_vector: np.ndarray, section_weights: Dict[str, float],
+                        rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if rows is None:
+            rows = slice(0, len(self.ids))
+            size = len(self.ids)
+        else:
+            size = rows.shape[0]
+        if not size:
+            return np.zeros(0, dtype=np.float32)
+        
+        query_vector = self.normalize(query_vector)
+        weights = np.zeros(len(self.section_names), dtype=np.float32)
+        for name, weight in section_weights.items():
+            if name in self.section_channels:
+                weights[self.section_channels[name]] = weight
+        
+        totals = np.zeros(size, dtype=np.float32)
+        norms = np.zeros(size, dtype=np.float32)
+        for channel in np.flatnonzero(weights):
+            present_weights = self.section_mask[channel, rows] * weights[channel]
+            totals += present_weights * (self.section_matrix[channel, rows] @ query_vector)
+            norms += present_weights
+        
+        full_text_weight = section_weights.get('full_text', 0.0)
+        if full_text_weight:
+            totals += full_text_weight * (self.matrix[rows] @ query_vector)
+            norms += full_text_weight
+        
+        return np.divide(totals, norms, out=np.zeros(size, dtype=np.float32), where=norms > 0)
+    
+    def exclusion_mask(self, item_ids: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(len(self.ids), dtype=bool)
+        rows = [self.id_to_row[item_id] for item_id in item_ids if item_id in self.id_to_row]
+        mask[rows] = True
+        return mask
+    
+    def search(self, query_vector: np.ndarray, top_k: int = 5, min_score: Optional[float] = None,
+               exclude_ids: Optional[Iterable[str]] = None,
+               section_weights: Optional[Dict[str, float]] = None,
+               exact: bool = False, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        query_vector = self.normalize(query_vector)
+        rows = None
+        if not exact and self.ann is not None and self.ann.is_trained:
+            rows = self.ann.candidate_rows(query_vector, nprobe)
+        
+        if section_weights:
+            scores = self.weighted_scores(query_vector, section_weights, rows)
+        else:
+            scores = self.scores(query_vector, rows)
+        
+        exclude = None
+        if exclude_ids:
+            exclude = self.exclusion_mask(exclude_ids)
+            if rows is not None:
+                exclude = exclude[rows]
+        
+        winners = select_top_k(scores, top_k, min_score, exclude)
+        if rows is not None:
+            return [(self.ids[rows[winner]], float(scores[winner])) for winner in winners]
+        return [(self.ids[row], float(scores[row])) for row in winners]
+    
+    def recall_report(self, query_vectors: np.ndarray, top_k: int = 10, nprobe: Optional[int] = None) -> Dict:
+        if self.ann is None or not self.ann.is_trained:
+            return {'error': 'Approximate index is not trained'}
+        
+        matched = 0
+        expected = 0
+        candidates = 0
+        exact_seconds = 0.0
+        ann_seconds = 0.0
+        
+        for query_vector in query_vectors:
+            started = time.perf_counter()
+            exact_ids = {item_id for item_id, _ in self.search(query_vector, top_k, exact=True)}
+            exact_seconds += time.perf_counter() - started
+            
+            started = time.perf_counter()
+            approximate_ids = {item_id for item_id, _ in self.search(query_vector, top_k, nprobe=nprobe)}
+            ann_seconds += time.perf_counter() - started
+            
+            candidates += self.ann.candidate_rows(self.normalize(query_vector), nprobe).shape[0]
+            matched += len(exact_ids & approximate_ids)
+            expected += len(exact_ids)
+        
+        queries = max(1, len(query_vectors))
+        return {
+            'queries': len(query_vectors),
+            'top_k': top_k,
+            'index_size': len(self.ids),
+            'nlist': self.ann.nlist,
+            'nprobe': min(nprobe or self.ann.nprobe, self.ann.nlist),
+            'recall': matched / expected if expected else 1.0,
+            'mean_candidates': candidates / queries,
+            'candidate_fraction': candidates / queries / max(1, len(self.ids)),
+            'exact_ms_per_query': exact_seconds * 1000 / queries,
+            'ann_ms_per_query': ann_seconds * 1000 / queries,
+            'speedup': exact_seconds / ann_seconds if ann_seconds else None
+        }
+    
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        size = len(self.ids)
+        if self.matrix is None:
+            section_matrix = np.zeros((len(self.section_names), 0, self.dimension or 0), dtype=np.float32)
+            section_mask = np.zeros((len(self.section_names), 0), dtype=bool)
+        else:
+            section_matrix = self.section_matrix[:, :size]
+            section_mask = self.section_mask[:, :size]
+        
+        arrays = {
+            'ids': np.array(self.ids, dtype=str),
+            'section_names': np.array(self.section_names, dtype=str),
+            'matrix': self.vectors(),
+            'section_matrix': section_matrix,
+            'section_mask': section_mask
+        }
+        if self.ann is not None:
+            arrays.update({f"ann_{name}": value for name, value in self.ann.state(size).items()})
+        return arrays
+    
+    @classmethod
+    def from_arrays(cls, data, initial_capacity: int = 1024) -> 'EmbeddingIndex':
+        ann_state = {name[len('ann_'):]: data[name] for name in data if name.startswith('ann_')}
+        index = cls(initial_capacity=initial_capacity, section_names=data['section_names'].tolist(),
+                    ann=IVFIndex.from_state(ann_state) if ann_state else None)
+        
+        matrix = data['matrix']
+        ids = data['ids'].tolist()
+        if matrix.shape[1]:
+            index.initial_capacity = max(index.initial_capacity, len(ids))
+            index._allocate(matrix.shape[1])
+            index.initial_capacity = initial_capacity
+            index.matrix[:len(ids)] = matrix
+            index.section_matrix[:, :len(ids)] = data['section_matrix']
+            index.section_mask[:, :len(ids)] = data['section_mask']
+        
+        index.ids = ids
+        index.id_to_row = {item_id: row for row, item_id in enumerate(ids)}
+        return index
+    
+    def save(self, path: str):
+        np.savez(npz_path(path), **self.to_arrays())
+    
+    @classmethod
+    def load(cls, path: str, initial_capacity: int = 1024) -> 'EmbeddingIndex':
+        with np.load(npz_path(path)) as data:
+            return cls.from_arrays(data, initial_capacity)
+    
+    def clear(self):
+        self.ids = []
+        self.id_to_row = {}
+        if self.ann is not None:
+            self.ann.reset()
+        if self.matrix is not None:
+            self._allocate(self.dimension)
@@ -1,29 +1,108 @@
+import json
+import sqlite3
+import time
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 import torch
+from .ann_index import IVFIndex
+from .document_parser import SECTION_NAMES
+from .embedding_index import EmbeddingIndex, npz_path, select_top_k
+from .embedding_cache import LRUEmbeddingCache, text_hash
+from .ingest_trace import IngestTrace, amortise
+from .model_registry import ModelRegistry, default_registry
+
+DEFAULT_SECTION_WEIGHTS = {'skills': 0.5, 'experience': 0.3, 'full_text': 0.2}
 
 class EmbeddingSystem:
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
-        self.model = SentenceTransformer(model_name)
-        self.embeddings_cache = {}
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', batch_size: int = 32, cache_path: Optional[str] = None,
+                 cache_memory_mb: float = 256, registry: Optional[ModelRegistry] = None,
+                 ann_index: Optional[IVFIndex] = None):
+        self.model_name = model_name
+        self.registry = registry or default_registry
+        self.batch_size = batch_size
+        self.embeddings_cache = LRUEmbeddingCache(cache_memory_mb)
         self.text_cache = {}
+        self.index = EmbeddingIndex(section_names=SECTION_NAMES, ann=ann_index)
+        self.unregistered_ids = set()
+        self.persistent_cache = None
+        if cache_path:
+            try:
+                self.persistent_cache = self.registry.get_persistent_cache(cache_path)
+            except (OSError, sqlite3.Error):
+                pass
+        self._model = None
+    
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self.registry.get_embedding_model(self.model_name)
+        return self._model
     
     def get_embedding(self, text: str) -> np.ndarray:
-        if text in self.embeddings_cache:
-            return self.embeddings_cache[text]
+        key = text_hash(text)
+        embedding = self.embeddings_cache.get(key)
+        if embedding is not None:
+            return embedding
+        
+        if self.persistent_cache is not None:
+            embedding = self.persistent_cache.get(self.model_name, key)
+            if embedding is None:
+                embedding = self.model.encode(text)
+                self.persistent_cache.put(self.model_name, key, embedding)
+        else:
+            embedding = self.model.encode(text)
         
-        embedding = self.model.encode(text)
-        self.embeddings_cache[text] = embedding
+        self.embeddings_cache.put(key, embedding)
         return embedding
     
-    def get_embeddings_batch(self, texts: List[str]) -> np.ndarray:
-        embeddings = []
-        for text in texts:
-            embedding = self.get_embedding(text)
-            embeddings.append(embedding)
-        return np.array(embeddings)
+    def get_embeddings_batch(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        return self._embed_batch(texts, batch_size)[0]
+    
+    def _embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> Tuple[np.ndarray, List[bool]]:
+        keys = [text_hash(text) for text in texts]
+        embeddings = [self.embeddings_cache.get(key) for key in keys]
+        cache_hits = [embedding is not None for embedding in embeddings]
+        
+        pending = {}
+        for position, (key, embedding) in enumerate(zip(keys, embeddings)):
+            if embedding is None:
+                pending.setdefault(key, []).append(position)
+        
+        if pending:
+            resolved = self._load_persisted(pending)
+            texts_by_key = {key: texts[positions[0]] for key, positions in pending.items() if key not in resolved}
+            
+            for key, positions in pending.items():
+                if key not in texts_by_key:
+                    for position in positions:
+                        cache_hits[position] = True
+            
+            if texts_by_key:
+                missing = sorted(texts_by_key, key=lambda key: len(texts_by_key[key]), reverse=True)
+                encoded = self.model.encode([texts_by_key[key] for key in missing],
+                                            batch_size=batch_size or self.batch_size, show_progress_bar=False)
+                encoded_by_key = dict(zip(missing, encoded))
+                self._persist(encoded_by_key)
+                resolved.update(encoded_by_key)
+            
+            for key, positions in pending.items():
+                embedding = resolved[key]
+                self.embeddings_cache.put(key, embedding)
+                for position in positions:
+                    embeddings[position] = embedding
+        
+        return np.array(embeddings), cache_hits
+    
+    def _load_persisted(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        if self.persistent_cache is None:
+            return {}
+        return self.persistent_cache.get_many(self.model_name, keys)
+    
+    def _persist(self, embeddings: Dict[str, np.ndarray]):
+        if self.persistent_cache is None:
+            return
+        self.persistent_cache.put_many(self.model_name, embeddings)
     
     def calculate_similarity(self, text1: str, text2: str) -> float:
         embedding1 = self.get_embedding(text1)
@@ -40,60 +119,160 @@ class EmbeddingSystem:
         return similarities.tolist()
     
     def store_resume_embedding(self, resume_id: str, text: str, sections: Dict[str, str] = None):
-        full_embedding = self.get_embedding(text)
+        self.store_resume_embeddings([(resume_id, text, sections)])
+    
+    def store_resume_embeddings(self, resumes: List[Tuple[str, str, Optional[Dict[str, str]]]],
+                                traces: Optional[List[IngestTrace]] = None):
+        traces = traces or [None] * len(resumes)
+        pending = []
+        texts = []
+        for (resume_id, text, sections), trace in zip(resumes, traces):
+            existing = self.text_cache.get(resume_id)
+            if existing is not None and existing['full_text'] == text:
+                if trace is not None:
+                    trace.mark_cache('embedding', True)
+                continue
+            
+            section_names = [name for name, section_text in (sections or {}).items() if section_text.strip()]
+            pending.append((resume_id, text, sections, section_names, len(texts), trace))
+            texts.append(text)
+            texts.extend(sections[name] for name in section_names)
         
-        self.text_cache[resume_id] = {
-            'full_text': text,
-            'full_embedding': full_embedding,
-            'sections': sections or {}
-        }
+        if not pending:
+            return
+        
+        started = time.perf_counter()
+        embeddings, cache_hits = self._embed_batch(texts)
+        encoded_chars = [
+            sum(len(texts[position]) for position in range(offset, offset + 1 + len(section_names)) if not cache_hits[position])
+            for _, _, _, section_names, offset, _ in pending
+        ]
+        shares = amortise(time.perf_counter() - started, encoded_chars)
+        encoded_resumes = sum(1 for chars in encoded_chars if chars)
         
-        if sections:
-            section_embeddings = {}
-            for section_name, section_text in sections.items():
-                if section_text.strip():
-                    section_embeddings[section_name] = self.get_embedding(section_text)
+        for (resume_id, text, sections, section_names, offset, trace), share, chars in zip(pending, shares, encoded_chars):
+            if trace is not None:
+                trace.record('embedding', share)
+                trace.mark_cache('embedding', not chars)
+                if encoded_resumes > 1 and chars:
+                    trace.mark_amortised('embedding')
+                started = time.perf_counter()
             
-            self.text_cache[resume_id]['section_embeddings'] = section_embeddings
+            self.text_cache[resume_id] = {
+                'full_text': text,
+                'section_names': section_names
+            }
+            
+            section_embeddings = dict(zip(section_names, embeddings[offset + 1:offset + 1 + len(section_names)]))
+            self.index.add(resume_id, embeddings[offset], section_embeddings)
+            self.unregistered_ids.discard(resume_id)
+            if trace is not None:
+                trace.record('index_insert', time.perf_counter() - started)
+    
+    def remove_resume_embedding(self, resume_id: str) -> bool:
+        removed = self.text_cache.pop(resume_id, None) is not None
+        self.unregistered_ids.discard(resume_id)
+        return self.index.remove(resume_id) or removed
     
     def get_resume_embedding(self, resume_id: str) -> Optional[Dict]:
-        return self.text_cache.get(resume_id)
+        resume_data = self.text_cache.get(resume_id)
+        full_embedding = self.index.get_vector(resume_id)
+        if resume_data is None or full_embedding is None:
+            return None
+        
+        section_embeddings = self.index.get_section_vectors(resume_id)
+        if 'full_text' in resume_data['section_names']:
+            section_embeddings['full_text'] = full_embedding
+        
+        return {
+            'full_text': resume_data['full_text'],
+            'full_embedding': full_embedding,
+            'section_embeddings': section_embeddings
+        }
     
-    def match_resume_to_job(self, resume_id: str, job_description: str) -> Dict:
-        if resume_id not in self.text_cache:
+    def match_resume_to_job(self, resume_id: str, job_description: str,
+                            section_weights: Optional[Dict[str, float]] = None) -> Dict:
+        if resume_id not in self.text_cache or resume_id not in self.index:
             return {'error': 'Resume not found'}
         
         resume_data = self.text_cache[resume_id]
         job_embedding = self.get_embedding(job_description)
         
-        full_similarity = cosine_similarity([resume_data['full_embedding']], [job_embedding])[0][0]
+        full_similarity = float(self.index.get_vector(resume_id) @ self.index.normalize(job_embedding))
+        indexed_scores = self.index.section_scores(resume_id, job_embedding)
         
-        result = {
-            'overall_score': float(full_similarity),
-            'section_scores': {}
-        }
+        section_scores = {}
+        for section_name in resume_data['section_names']:
+            section_scores[section_name] = full_similarity if section_name == 'full_text' else indexed_scores[section_name]
         
-        if 'section_embeddings' in resume_data:
-            for section_name, section_embedding in resume_data['section_embeddings'].items():
-                section_similarity = cosine_similarity([section_embedding], [job_embedding])[0][0]
-                result['section_scores'][section_name] = float(section_similarity)
+        overall_score = full_similarity
+        if section_weights:
+            rows = np.array([self.index.id_to_row[resume_id]])
+            overall_score = float(self.index.weighted_scores(job_embedding, section_weights, rows)[0])
         
-        return result
+        return {
+            'overall_score': overall_score,
+            'section_scores': section_scores
+        }
     
-    def find_top_matches(self, query_text: str, candidate_texts: List[str], top_k: int = 5) -> List[Tuple[int, float]]:
-        similarities = self.calculate_similarity_batch(query_text, candidate_texts)
+    def find_top_matches(self, query_text: str, candidate_texts: List[str], top_k: int = 5,
+                         min_score: Optional[float] = None, exclude: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        if not candidate_texts:
+            return []
         
-        indexed_similarities = list(enumerate(similarities))
-        indexed_similarities.sort(key=lambda x: x[1], reverse=True)
+        similarities = np.asarray(self.calculate_similarity_batch(query_text, candidate_texts))
+        top_indices = select_top_k(similarities, top_k, min_score, exclude)
+        
+        return [(int(idx), float(similarities[idx])) for idx in top_indices]
+    
+    def find_top_resumes(self, query_text: str, top_k: int = 5, min_score: Optional[float] = None,
+                         exclude_ids: Optional[Iterable[str]] = None,
+                         section_weights: Optional[Dict[str, float]] = None,
+                         exact: bool = False) -> List[Tuple[str, float]]:
+        query_embedding = self.get_embedding(query_text)
+        if self.unregistered_ids:
+            exclude_ids = self.unregistered_ids.union(exclude_ids or ())
+        return self.index.search(query_embedding, top_k, min_score, exclude_ids, section_weights, exact)
+    
+    def ann_recall_report(self, query_texts: List[str], top_k: int = 10, nprobe: Optional[int] = None) -> Dict:
+        return self.index.recall_report(self.get_embeddings_batch(query_texts), top_k, nprobe)
+    
+    def save_index(self, path: str, extra: Optional[Dict] = None):
+        arrays = self.index.to_arrays()
+        arrays['records'] = np.array(json.dumps(self.text_cache))
+        arrays['extra'] = np.array(json.dumps(extra or {}, default=str))
+        np.savez(npz_path(path), **arrays)
+    
+    def load_index(self, path: str) -> Dict:
+        with np.load(npz_path(path)) as data:
+            self.index = EmbeddingIndex.from_arrays(data)
+            records = json.loads(str(data['records'])) if 'records' in data else {}
+            extra = json.loads(str(data['extra'])) if 'extra' in data else {}
         
-        return indexed_similarities[:top_k]
+        for resume_id in [resume_id for resume_id in self.text_cache if resume_id not in self.index]:
+            del self.text_cache[resume_id]
+        self.text_cache.update((resume_id, record) for resume_id, record in records.items() if resume_id in self.index)
+        self.unregistered_ids = {item_id for item_id in self.index.ids if item_id not in self.text_cache}
+        return extra
     
     def clear_cache(self):
         self.embeddings_cache.clear()
         self.text_cache.clear()
+        self.unregistered_ids.clear()
+        self.index.clear()
     
     def get_cache_stats(self) -> Dict:
+        memory_stats = self.embeddings_cache.get_stats()
         return {
             'embeddings_cache_size': len(self.embeddings_cache),
-            'text_cache_size': len(self.text_cache)
+            'embeddings_cache_bytes': memory_stats['memory_bytes'],
+            'embeddings_cache_limit_bytes': memory_stats['memory_limit_bytes'],
+            'cache_hits': memory_stats['hits'],
+            'cache_misses': memory_stats['misses'],
+            'cache_evictions': memory_stats['evictions'],
+            'cache_hit_rate': memory_stats['hit_rate'],
+            'text_cache_size': len(self.text_cache),
+            'index_size': len(self.index),
+            'ann_index': self.index.ann.get_stats() if self.index.ann is not None else None,
+            'persistent_cache_size': len(self.persistent_cache) if self.persistent_cache is not None else 0
         } 
\ No newline at end of file
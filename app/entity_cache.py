@@ -0,0 +1,77 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional
+
+class PersistentEntityCache:
+    def __init__(self, db_path: str, max_query_params: int = 500):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        
+        self.db_path = db_path
+        self.max_query_params = max_query_params
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS entities ('
+            'extractor_version TEXT NOT NULL, '
+            'text_hash TEXT NOT NULL, '
+            'entities TEXT NOT NULL, '
+            'PRIMARY KEY (extractor_version, text_hash))'
+        )
+        self._connection.commit()
+    
+    def get(self, extractor_version: str, key: str) -> Optional[Dict]:
+        return self.get_many(extractor_version, [key]).get(key)
+    
+    def get_many(self, extractor_version: str, keys: Iterable[str]) -> Dict[str, Dict]:
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        
+        with self._lock:
+            for start in range(0, len(keys), self.max_query_params):
+                chunk = keys[start:start + self.max_query_params]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._connection.execute(
+                    f'SELECT text_hash, entities FROM entities WHERE extractor_version = ? AND text_hash IN ({placeholders})',
+                    [extractor_version] + chunk
+                ).fetchall()
+                
+                for key, payload in rows:
+                    found[key] = json.loads(payload)
+        
+        return found
+    
+    def put(self, extractor_version: str, key: str, entities: Dict):
+        self.put_many(extractor_version, {key: entities})
+    
+    def put_many(self, extractor_version: str, entities: Dict[str, Dict]):
+        if not entities:
+            return
+        
+        rows = [(extractor_version, key, json.dumps(value)) for key, value in entities.items()]
+        
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO entities (extractor_version, text_hash, entities) VALUES (?, ?, ?)',
+                rows
+            )
+            self._connection.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM entities').fetchone()[0]
+    
+    def clear(self, extractor_version: Optional[str] = None):
+        with self._lock:
+            if extractor_version is None:
+                self._connection.execute('DELETE FROM entities')
+            else:
+                self._connection.execute('DELETE FROM entities WHERE extractor_version = ?', (extractor_version,))
+            self._connection.commit()
+    
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,64 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+INGEST_STAGES = ('hash', 'read', 'parse', 'clean', 'isolation', 'sectioning', 'ner', 'embedding', 'index_insert')
+
+def amortise(seconds: float, weights: List[float]) -> List[float]:
+    total = sum(weights)
+    if not total:
+        return [seconds / len(weights)] * len(weights) if weights else []
+    return [seconds * weight / total for weight in weights]
+
+class IngestTrace:
+    def __init__(self):
+        self.started_at = time.time()
+        self.stages = {}
+        self.cache = {}
+        self.details = {}
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+    
+    def record(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+    
+    def merge(self, stages: Dict[str, float]):
+        for name, seconds in stages.items():
+            self.record(name, seconds)
+    
+    def mark_cache(self, name: str, hit: bool):
+        self.cache[name] = hit
+    
+    def annotate(self, name: str, value):
+        self.details[name] = value
+    
+    def mark_amortised(self, name: str):
+        stages = self.details.setdefault('amortised_stages', [])
+        if name not in stages:
+            stages.append(name)
+    
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.stages.values())
+    
+    def slowest_stage(self) -> Optional[str]:
+        if not self.stages:
+            return None
+        return max(self.stages, key=self.stages.get)
+    
+    def to_dict(self) -> Dict:
+        ordered = sorted(self.stages, key=lambda name: INGEST_STAGES.index(name) if name in INGEST_STAGES else len(INGEST_STAGES))
+        return {
+            'started_at': self.started_at,
+            'total_ms': round(self.total_seconds * 1000, 3),
+            'stages_ms': {name: round(self.stages[name] * 1000, 3) for name in ordered},
+            'slowest_stage': self.slowest_stage(),
+            'cache': dict(self.cache),
+            'details': dict(self.details)
+        }
@@ -1,39 +1,46 @@
 import re
-from typing import Dict, List, Tuple, Optional
-from .embedding_system import EmbeddingSystem
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from .embedding_system import DEFAULT_SECTION_WEIGHTS, EmbeddingSystem
+
+STOPWORDS = frozenset({'the', 'and', 'for', 'with', 'this', 'that', 'have', 'been', 'from', 'they', 'will', 'would', 'could', 'should'})
+
+_TOKEN_RE = re.compile(r'\b\w+\b')
+
+def match_terms(text: str) -> Set[str]:
+    return {word for word in _TOKEN_RE.findall(text.lower()) if len(word) > 2 and word not in STOPWORDS}
 
 class MatchingEngine:
-    def __init__(self):
-        self.embedding_system = EmbeddingSystem()
+    def __init__(self, embedding_system: Optional[EmbeddingSystem] = None):
+        self.embedding_system = embedding_system or EmbeddingSystem()
         self.processed_resumes = {}
+        self.term_ids = {}
+        self.terms = []
     
     def add_resume(self, resume_id: str, resume_text: str, sections: Dict[str, str] = None, entities: Dict = None):
         self.processed_resumes[resume_id] = {
             'text': resume_text,
             'sections': sections or {},
-            'entities': entities or {}
+            'entities': entities or {},
+            'term_ids': self._intern_terms(resume_text)
         }
         self.embedding_system.store_resume_embedding(resume_id, resume_text, sections)
     
-    def match_job_to_resumes(self, job_description: str, top_k: int = 5, include_entities: bool = True) -> List[Dict]:
+    def match_job_to_resumes(self, job_description: str, top_k: int = 5, include_entities: bool = True,
+                             min_score: Optional[float] = None, exclude_ids: Optional[Iterable[str]] = None,
+                             section_weights: Optional[Dict[str, float]] = DEFAULT_SECTION_WEIGHTS) -> List[Dict]:
         if not self.processed_resumes:
             return []
         
-        resume_texts = []
-        resume_ids = []
-        
-        for resume_id, resume_data in self.processed_resumes.items():
-            resume_texts.append(resume_data['text'])
-            resume_ids.append(resume_id)
-        
-        top_matches = self.embedding_system.find_top_matches(job_description, resume_texts, top_k)
+        top_matches = self.embedding_system.find_top_resumes(job_description, top_k, min_score, exclude_ids, section_weights)
+        query_term_ids = self._query_term_ids(job_description)
         
         results = []
-        for idx, score in top_matches:
-            resume_id = resume_ids[idx]
-            resume_data = self.processed_resumes[resume_id]
+        for resume_id, score in top_matches:
+            resume_data = self.processed_resumes.get(resume_id)
+            if resume_data is None:
+                continue
             
-            matched_terms = self._extract_matched_terms(job_description, resume_data['text'])
+            matched_terms = self._extract_matched_terms(query_term_ids, resume_data)
             
             result = {
                 'resume_id': resume_id,
@@ -51,17 +58,18 @@ class MatchingEngine:
         
         return results
     
-    def match_single_resume(self, resume_id: str, job_description: str) -> Optional[Dict]:
+    def match_single_resume(self, resume_id: str, job_description: str,
+                            section_weights: Optional[Dict[str, float]] = DEFAULT_SECTION_WEIGHTS) -> Optional[Dict]:
         if resume_id not in self.processed_resumes:
             return None
         
         resume_data = self.processed_resumes[resume_id]
-        match_result = self.embedding_system.match_resume_to_job(resume_id, job_description)
+        match_result = self.embedding_system.match_resume_to_job(resume_id, job_description, section_weights)
         
         if 'error' in match_result:
             return None
         
-        matched_terms = self._extract_matched_terms(job_description, resume_data['text'])
+        matched_terms = self._extract_matched_terms(self._query_term_ids(job_description), resume_data)
         
         return {
             'resume_id': resume_id,
@@ -73,18 +81,23 @@ class MatchingEngine:
             'sections': list(resume_data['sections'].keys()) if resume_data['sections'] else []
         }
     
-    def _extract_matched_terms(self, job_description: str, resume_text: str) -> List[str]:
-        job_words = set(re.findall(r'\b\w+\b', job_description.lower()))
-        resume_words = set(re.findall(r'\b\w+\b', resume_text.lower()))
-        
-        common_words = job_words.intersection(resume_words)
-        
-        filtered_terms = []
-        for word in common_words:
-            if len(word) > 2 and word not in ['the', 'and', 'for', 'with', 'this', 'that', 'have', 'been', 'from', 'they', 'will', 'would', 'could', 'should']:
-                filtered_terms.append(word)
-        
-        return sorted(filtered_terms)[:10]
+    def _intern_terms(self, text: str) -> FrozenSet[int]:
+        ids = set()
+        for term in match_terms(text):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                term_id = len(self.terms)
+                self.term_ids[term] = term_id
+                self.terms.append(term)
+            ids.add(term_id)
+        return frozenset(ids)
+    
+    def _query_term_ids(self, job_description: str) -> FrozenSet[int]:
+        term_ids = self.term_ids
+        return frozenset(term_ids[term] for term in match_terms(job_description) if term in term_ids)
+    
+    def _extract_matched_terms(self, query_term_ids: FrozenSet[int], resume_data: Dict) -> List[str]:
+        return sorted(self.terms[term_id] for term_id in query_term_ids & resume_data['term_ids'])[:10]
     
     def get_resume_info(self, resume_id: str) -> Optional[Dict]:
         if resume_id not in self.processed_resumes:
@@ -100,11 +113,14 @@ class MatchingEngine:
     def remove_resume(self, resume_id: str) -> bool:
         if resume_id in self.processed_resumes:
             del self.processed_resumes[resume_id]
+            self.embedding_system.remove_resume_embedding(resume_id)
             return True
         return False
     
     def clear_all(self):
         self.processed_resumes.clear()
+        self.term_ids.clear()
+        self.terms.clear()
         self.embedding_system.clear_cache()
     
     def get_stats(self) -> Dict:
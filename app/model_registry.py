@@ -0,0 +1,75 @@
+import os
+import threading
+import spacy
+from sentence_transformers import SentenceTransformer
+from typing import Dict, Iterable, Optional
+from .embedding_cache import PersistentEmbeddingCache
+from .entity_cache import PersistentEntityCache
+from .skill_matcher import SkillMatcher
+
+class ModelRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._embedding_models = {}
+        self._nlp_pipelines = {}
+        self._persistent_caches = {}
+        self._entity_caches = {}
+        self._skill_matchers = {}
+    
+    def _get_or_load(self, store: Dict, key, loader):
+        resource = store.get(key)
+        if resource is not None:
+            return resource
+        
+        with self._lock:
+            resource = store.get(key)
+            if resource is None:
+                resource = loader()
+                store[key] = resource
+        return resource
+    
+    def get_embedding_model(self, model_name: str) -> SentenceTransformer:
+        return self._get_or_load(self._embedding_models, model_name, lambda: SentenceTransformer(model_name))
+    
+    def get_nlp(self, model_name: str = 'en_core_web_sm', exclude: Optional[Iterable[str]] = None):
+        exclude = tuple(sorted(exclude or ()))
+        return self._get_or_load(self._nlp_pipelines, (model_name, exclude),
+                                 lambda: spacy.load(model_name, exclude=list(exclude)))
+    
+    def get_skill_matcher(self, taxonomy_path: str, model_name: str = 'en_core_web_sm',
+                          exclude: Optional[Iterable[str]] = None) -> SkillMatcher:
+        nlp = self.get_nlp(model_name, exclude)
+        taxonomy_path = os.path.abspath(taxonomy_path)
+        key = (model_name, tuple(sorted(exclude or ())), taxonomy_path)
+        return self._get_or_load(self._skill_matchers, key, lambda: SkillMatcher(nlp, taxonomy_path))
+    
+    def get_persistent_cache(self, db_path: str) -> PersistentEmbeddingCache:
+        db_path = os.path.abspath(db_path)
+        return self._get_or_load(self._persistent_caches, db_path, lambda: PersistentEmbeddingCache(db_path))
+    
+    def get_entity_cache(self, db_path: str) -> PersistentEntityCache:
+        db_path = os.path.abspath(db_path)
+        return self._get_or_load(self._entity_caches, db_path, lambda: PersistentEntityCache(db_path))
+    
+    def get_stats(self) -> Dict:
+        return {
+            'embedding_models': list(self._embedding_models.keys()),
+            'nlp_pipelines': [model_name for model_name, _ in self._nlp_pipelines.keys()],
+            'skill_taxonomies': [taxonomy_path for _, _, taxonomy_path in self._skill_matchers.keys()],
+            'persistent_caches': list(self._persistent_caches.keys()),
+            'entity_caches': list(self._entity_caches.keys())
+        }
+    
+    def clear(self):
+        with self._lock:
+            self._embedding_models.clear()
+            self._nlp_pipelines.clear()
+            self._skill_matchers.clear()
+            for cache in self._persistent_caches.values():
+                cache.close()
+            self._persistent_caches.clear()
+            for cache in self._entity_caches.values():
+                cache.close()
+            self._entity_caches.clear()
+
+default_registry = ModelRegistry()
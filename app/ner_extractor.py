@@ -1,15 +1,54 @@
-import spacy
+import hashlib
+import os
 import re
-from typing import Dict, List, Set
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from datetime import datetime
+from .embedding_cache import text_hash
+from .ingest_trace import IngestTrace, amortise
+from .model_registry import ModelRegistry, default_registry
+from .skill_matcher import DEFAULT_SKILL_TAXONOMY_PATH, SkillMatcher
+
+EXTRACTOR_VERSION = '2'
+
+UNUSED_PIPELINE_COMPONENTS = ('tagger', 'attribute_ruler', 'parser', 'lemmatizer', 'senter')
+
+EDUCATION_ORG_WORDS = frozenset({'university', 'college', 'school', 'institute', 'academy'})
+COMPANY_SKILL_WORDS = frozenset({'python', 'java', 'react', 'docker', 'aws', 'git', 'sql', 'javascript', 'tensorflow', 'pytorch', 'pandas', 'numpy', 'spark', 'hadoop', 'tableau', 'power bi', 'slack', 'teams', 'zoom', 'skype', 'trello', 'asana', 'notion', 'confluence', 'bitbucket', 'github', 'gitlab'})
+LOCATION_SKILL_WORDS = frozenset({'react', 'node.js', 'django', 'flask', 'postgresql', 'python', 'numpy', 'pandas', 'tensorflow', 'pytorch', 'spark', 'hadoop', 'tableau', 'power bi'})
+TITLE_WORDS = frozenset({'manager', 'director', 'engineer', 'developer', 'analyst', 'specialist', 'coordinator', 'assistant', 'lead', 'senior', 'junior'})
+
+def _substring_pattern(words: Iterable[str]):
+    return re.compile('|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True)))
+
+_EDUCATION_ORG_RE = _substring_pattern(EDUCATION_ORG_WORDS)
+_COMPANY_SKILL_RE = _substring_pattern(COMPANY_SKILL_WORDS)
+_LOCATION_SKILL_RE = _substring_pattern(LOCATION_SKILL_WORDS)
+_TITLE_RE = _substring_pattern(TITLE_WORDS)
+_DIGIT_RE = re.compile(r'\d')
 
 class NERExtractor:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.skill_patterns = [
-            r'\b(?:Python|Java|JavaScript|C\+\+|C#|Ruby|PHP|Swift|Kotlin|Go|Rust|Scala|TypeScript|React|Angular|Vue|Node\.js|Django|Flask|Spring|Laravel|Express|MongoDB|PostgreSQL|MySQL|Redis|Docker|Kubernetes|AWS|Azure|GCP|Git|Jenkins|Jira|Agile|Scrum|Machine Learning|AI|Data Science|SQL|NoSQL|HTML|CSS|REST|API|GraphQL|Microservices|DevOps|CI/CD|TensorFlow|PyTorch|Scikit-learn|Pandas|NumPy|Spark|Hadoop|Jupyter|Tableau|Power BI|Looker|Salesforce|HubSpot|Zendesk|Slack|Teams|Zoom|Skype|Trello|Asana|Notion|Confluence|Bitbucket|GitHub|GitLab)\b',
-            r'\b(?:Excel|Word|PowerPoint|Outlook|Photoshop|Illustrator|InDesign|Premiere|After Effects|AutoCAD|SolidWorks|MATLAB|R|SAS|SPSS)\b'
-        ]
+    def __init__(self, model_name: str = "en_core_web_sm", registry: Optional[ModelRegistry] = None,
+                 exclude: Iterable[str] = UNUSED_PIPELINE_COMPONENTS, batch_size: int = 64, n_process: Optional[int] = None,
+                 skill_taxonomy_path: str = DEFAULT_SKILL_TAXONOMY_PATH, cache_path: Optional[str] = None,
+                 parallel_threshold: int = 256):
+        self.model_name = model_name
+        self.skill_taxonomy_path = skill_taxonomy_path
+        self.registry = registry or default_registry
+        self.exclude = tuple(exclude)
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.parallel_threshold = parallel_threshold
+        self._nlp = None
+        self._skill_matcher = None
+        self._cache_version = None
+        self.entity_cache = None
+        if cache_path:
+            try:
+                self.entity_cache = self.registry.get_entity_cache(cache_path)
+            except (OSError, sqlite3.Error):
+                pass
         
         self.education_keywords = {
             'degrees': ['bachelor', 'master', 'phd', 'doctorate', 'associate', 'diploma', 'certificate'],
@@ -17,38 +56,119 @@ class NERExtractor:
         }
         
         self.experience_keywords = ['experience', 'work', 'employment', 'job', 'position', 'role', 'career']
-        
+    
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            self._nlp = self.registry.get_nlp(self.model_name, self.exclude)
+        return self._nlp
+    
+    @property
+    def skill_matcher(self) -> SkillMatcher:
+        if self._skill_matcher is None:
+            self._skill_matcher = self.registry.get_skill_matcher(self.skill_taxonomy_path, self.model_name, self.exclude)
+        return self._skill_matcher
+    
+    @property
+    def cache_version(self) -> str:
+        if self._cache_version is None:
+            with open(self.skill_taxonomy_path, 'rb') as file:
+                taxonomy_hash = hashlib.sha256(file.read()).hexdigest()[:16]
+            self._cache_version = f"{EXTRACTOR_VERSION}:{self.model_name}:{taxonomy_hash}"
+        return self._cache_version
+    
     def extract_entities(self, text: str) -> Dict:
-        doc = self.nlp(text)
+        return self._entities_from_doc(text, self.nlp(text))
+    
+    def extract_entities_batch(self, texts: List[str], batch_size: Optional[int] = None,
+                               n_process: Optional[int] = None) -> List[Dict]:
+        return self._extract_entities_timed(texts, batch_size, n_process)[0]
+    
+    def _extract_entities_timed(self, texts: List[str], batch_size: Optional[int] = None,
+                                n_process: Optional[int] = None) -> Tuple[List[Dict], List[float]]:
+        batch_size = batch_size or self.batch_size
+        n_process = n_process or self.n_process
+        if n_process is None:
+            n_process = (os.cpu_count() or 1) if len(texts) >= self.parallel_threshold else 1
+        n_process = min(n_process, max(1, -(-len(texts) // batch_size)))
+        docs = self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        
+        extracted = []
+        waits = []
+        seconds = []
+        previous = time.perf_counter()
+        for text, doc in zip(texts, docs):
+            yielded = time.perf_counter()
+            waits.append(yielded - previous)
+            extracted.append(self._entities_from_doc(text, doc))
+            previous = time.perf_counter()
+            seconds.append(previous - yielded)
+        
+        for start in range(0, len(texts), batch_size):
+            stop = start + batch_size
+            shares = amortise(sum(waits[start:stop]), [len(text) for text in texts[start:stop]])
+            for position, share in enumerate(shares, start):
+                seconds[position] += share
+        
+        return extracted, seconds
+    
+    def _entities_from_doc(self, text: str, doc) -> Dict:
+        routed = self._route_entities(doc)
         
         entities = {
             'skills': self._extract_skills(text, doc),
-            'education': self._extract_education(text, doc),
+            'education': self._extract_education(text, routed['institutions']),
             'experience': self._extract_experience(text, doc),
-            'companies': self._extract_companies(doc),
-            'dates': self._extract_dates(doc),
-            'locations': self._extract_locations(doc),
-            'titles': self._extract_titles(doc)
+            'companies': routed['companies'],
+            'dates': routed['dates'],
+            'locations': routed['locations'],
+            'titles': routed['titles']
         }
         
         return entities
     
-    def _extract_skills(self, text: str, doc) -> List[str]:
-        skills = set()
-        
-        for pattern in self.skill_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            skills.update(matches)
+    def _route_entities(self, doc) -> Dict[str, List[str]]:
+        institutions = []
+        companies = []
+        dates = []
+        locations = []
+        titles = []
         
-        for token in doc:
-            if token.pos_ in ['NOUN', 'PROPN'] and len(token.text) > 2:
-                if any(keyword in token.text.lower() for keyword in ['tech', 'tool', 'framework', 'library', 'platform']):
-                    if not any(company_word in token.text.lower() for company_word in ['techcorp', 'startupxyz', 'stanford', 'mit']):
-                        skills.add(token.text.strip())
+        for ent in doc.ents:
+            label = ent.label_
+            
+            if label == 'DATE':
+                dates.append(ent.text)
+                continue
+            
+            entity_text = ent.text
+            entity_lower = entity_text.lower()
+            stripped = entity_text.strip()
+            
+            if label == 'ORG':
+                if _EDUCATION_ORG_RE.search(entity_lower):
+                    institutions.append(entity_text)
+                elif not _COMPANY_SKILL_RE.search(entity_lower) and len(stripped) > 2 and not _DIGIT_RE.search(entity_text):
+                    companies.append(stripped)
+            elif label == 'GPE':
+                if not _LOCATION_SKILL_RE.search(entity_lower) and len(stripped) > 1 and not _DIGIT_RE.search(entity_text):
+                    locations.append(stripped)
+            elif label == 'WORK_OF_ART':
+                if _TITLE_RE.search(entity_lower):
+                    titles.append(stripped)
         
-        return sorted(list(skills))
+        return {
+            'institutions': institutions,
+            'companies': list(dict.fromkeys(companies)),
+            'dates': dates,
+            'locations': list(dict.fromkeys(locations)),
+            'titles': list(dict.fromkeys(titles))
+        }
     
-    def _extract_education(self, text: str, doc) -> Dict:
+    def _extract_skills(self, text: str, doc) -> List[str]:
+        return self.skill_matcher.match(doc)
+    
+    def _extract_education(self, text: str, institutions: List[str]) -> Dict:
         education_info = {
             'degrees': [],
             'institutions': [],
@@ -66,10 +186,7 @@ class NERExtractor:
             if field in text_lower:
                 education_info['fields'].append(field.title())
         
-        for ent in doc.ents:
-            if ent.label_ == 'ORG':
-                if any(edu_word in ent.text.lower() for edu_word in ['university', 'college', 'school', 'institute', 'academy']):
-                    education_info['institutions'].append(ent.text)
+        education_info['institutions'] = institutions
         
         return education_info
     
@@ -88,56 +205,52 @@ class NERExtractor:
         
         return experience_info
     
-    def _extract_companies(self, doc) -> List[str]:
-        companies = []
-        skill_words = ['python', 'java', 'react', 'docker', 'aws', 'git', 'sql', 'javascript', 'tensorflow', 'pytorch', 'pandas', 'numpy', 'spark', 'hadoop', 'tableau', 'power bi', 'slack', 'teams', 'zoom', 'skype', 'trello', 'asana', 'notion', 'confluence', 'bitbucket', 'github', 'gitlab']
-        
-        for ent in doc.ents:
-            if ent.label_ == 'ORG':
-                text_lower = ent.text.lower()
-                if not any(edu_word in text_lower for edu_word in ['university', 'college', 'school', 'institute', 'academy']):
-                    if not any(skill_word in text_lower for skill_word in skill_words):
-                        if len(ent.text.strip()) > 2:
-                            if not any(char.isdigit() for char in ent.text):
-                                companies.append(ent.text.strip())
-        
-        return list(set(companies))
+    def get_structured_entities(self, text: str, trace: Optional[IngestTrace] = None) -> Dict:
+        return self.get_structured_entities_batch([text], traces=[trace] if trace else None)[0]
     
-    def _extract_dates(self, doc) -> List[str]:
-        dates = []
+    def get_structured_entities_batch(self, texts: List[str], batch_size: Optional[int] = None,
+                                      n_process: Optional[int] = None,
+                                      traces: Optional[List[IngestTrace]] = None) -> List[Dict]:
+        started = time.perf_counter()
+        structured, cache_hits, seconds = self._structured_entities_batch(texts, batch_size, n_process)
         
-        for ent in doc.ents:
-            if ent.label_ == 'DATE':
-                dates.append(ent.text)
+        if traces and texts:
+            overhead = (time.perf_counter() - started - sum(seconds)) / len(texts)
+            piped = len(texts) - sum(cache_hits)
+            for trace, cache_hit, document_seconds in zip(traces, cache_hits, seconds):
+                trace.record('ner', document_seconds + overhead)
+                trace.mark_cache('entities', cache_hit)
+                if piped > 1 and not cache_hit:
+                    trace.mark_amortised('ner')
         
-        return dates
+        return structured
     
-    def _extract_locations(self, doc) -> List[str]:
-        locations = []
-        skill_words = ['react', 'node.js', 'django', 'flask', 'postgresql', 'python', 'numpy', 'pandas', 'tensorflow', 'pytorch', 'spark', 'hadoop', 'tableau', 'power bi']
+    def _structured_entities_batch(self, texts: List[str], batch_size: Optional[int],
+                                   n_process: Optional[int]) -> Tuple[List[Dict], List[bool], List[float]]:
+        if self.entity_cache is None:
+            extracted, seconds = self._extract_entities_timed(texts, batch_size, n_process)
+            return [self._structure_entities(entities) for entities in extracted], [False] * len(texts), seconds
         
-        for ent in doc.ents:
-            if ent.label_ == 'GPE':
-                if not any(skill_word in ent.text.lower() for skill_word in skill_words):
-                    if len(ent.text.strip()) > 1:
-                        if not any(char.isdigit() for char in ent.text):
-                            locations.append(ent.text.strip())
+        keys = [text_hash(text) for text in texts]
+        cached = self.entity_cache.get_many(self.cache_version, keys)
         
-        return list(set(locations))
-    
-    def _extract_titles(self, doc) -> List[str]:
-        titles = []
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
         
-        for ent in doc.ents:
-            if ent.label_ == 'WORK_OF_ART':
-                if any(title_word in ent.text.lower() for title_word in ['manager', 'director', 'engineer', 'developer', 'analyst', 'specialist', 'coordinator', 'assistant', 'lead', 'senior', 'junior']):
-                    titles.append(ent.text.strip())
+        seconds_by_key = {}
+        if missing:
+            extracted, seconds = self._extract_entities_timed(list(missing.values()), batch_size, n_process)
+            computed = {key: self._structure_entities(entities) for key, entities in zip(missing, extracted)}
+            self.entity_cache.put_many(self.cache_version, computed)
+            cached.update(computed)
+            seconds_by_key = dict(zip(missing, seconds))
         
-        return list(set(titles))
+        return ([cached[key] for key in keys], [key not in missing for key in keys],
+                [seconds_by_key.get(key, 0.0) for key in keys])
     
-    def get_structured_entities(self, text: str) -> Dict:
-        entities = self.extract_entities(text)
-        
+    def _structure_entities(self, entities: Dict) -> Dict:
         structured_output = {
             'skills': entities['skills'],
             'education': {
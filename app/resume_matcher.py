@@ -1,18 +1,28 @@
-from typing import Dict, List, Optional
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .ann_index import IVFIndex
+from .embedding_system import DEFAULT_SECTION_WEIGHTS, EmbeddingSystem
 from .resume_processor import ResumeProcessor
 from .matching_engine import MatchingEngine
 from .advanced_analytics import AdvancedAnalytics
+from .dataset_loader import iter_resume_records
 
 class ResumeMatcher:
-    def __init__(self):
-        self.processor = ResumeProcessor()
-        self.matching_engine = MatchingEngine()
+    def __init__(self, cache_path: Optional[str] = None, entity_cache_path: Optional[str] = None,
+                 ann_index: Optional[IVFIndex] = None, ner_batch_size: int = 64, ner_n_process: Optional[int] = None,
+                 max_pages: Optional[int] = 5, page_workers: int = 0, parse_timeout: Optional[float] = 30.0,
+                 parse_memory_limit_mb: Optional[int] = 1024):
+        self.embedding_system = EmbeddingSystem(cache_path=cache_path, ann_index=ann_index)
+        self.processor = ResumeProcessor(self.embedding_system, entity_cache_path, ner_batch_size, ner_n_process,
+                                         max_pages, page_workers, parse_timeout, parse_memory_limit_mb)
+        self.matching_engine = MatchingEngine(self.embedding_system)
         self.analytics = AdvancedAnalytics()
+        self.analytics_cache = {}
     
     def add_resume_file(self, file_path: str) -> Dict:
         result = self.processor.process_resume_file(file_path)
         
-        if result['success']:
+        if result['success'] and not result.get('duplicate'):
             resume_data = self.processor.processed_resumes[result['resume_id']]
             self.matching_engine.add_resume(
                 result['resume_id'],
@@ -23,10 +33,64 @@ class ResumeMatcher:
         
         return result
     
+    def add_resume_files(self, file_paths: List[str], max_workers: Optional[int] = None,
+                         progress_callback: Optional[Callable[[int, int, Dict], None]] = None) -> List[Dict]:
+        results = self.processor.process_resume_files(file_paths, max_workers, progress_callback)
+        self._register_results(results)
+        return results
+    
+    def add_resume_bytes(self, data: bytes, file_name: str) -> Dict:
+        return self.add_resume_uploads([(file_name, data)])[0]
+    
+    def add_resume_uploads(self, uploads: List[Tuple[str, bytes]], max_workers: Optional[int] = None,
+                           progress_callback: Optional[Callable[[int, int, Dict], None]] = None) -> List[Dict]:
+        results = self.processor.process_resume_uploads(uploads, max_workers, progress_callback)
+        self._register_results(results)
+        return results
+    
+    def _register_results(self, results: List[Dict]):
+        for result in results:
+            if result['success'] and (result.get('updated') or result['resume_id'] not in self.matching_engine.processed_resumes):
+                resume_data = self.processor.processed_resumes[result['resume_id']]
+                self.matching_engine.add_resume(
+                    result['resume_id'],
+                    resume_data['text'],
+                    resume_data['sections'],
+                    resume_data.get('entities', {})
+                )
+    
+    def add_resumes_from_csv(self, csv_path: str, chunk_size: int = 500,
+                             progress_callback: Optional[Callable[[int, Dict], None]] = None) -> Dict:
+        summary = {'rows': 0, 'added': 0, 'updated': 0, 'duplicates': 0}
+        
+        for records in iter_resume_records(csv_path, chunk_size):
+            results = self.processor.process_resume_records(records)
+            for result in results:
+                if result.get('duplicate'):
+                    summary['duplicates'] += 1
+                    continue
+                
+                self.analytics_cache.pop(result['resume_id'], None)
+                summary['updated' if result['updated'] else 'added'] += 1
+            self._register_results(results)
+            
+            summary['rows'] += len(records)
+            if progress_callback:
+                progress_callback(summary['rows'], dict(summary))
+        
+        return summary
+    
+    def find_resume_by_content(self, data: bytes) -> Optional[str]:
+        return self.processor.find_resume_by_content(data)
+    
+    def find_failure_by_content(self, data: bytes) -> Optional[Dict]:
+        return self.processor.find_failure_by_content(data)
+    
     def add_resume_text(self, text: str, resume_id: str = None) -> Dict:
         result = self.processor.process_resume_text(text, resume_id)
         
         if result['success']:
+            self.analytics_cache.pop(result['resume_id'], None)
             resume_data = self.processor.processed_resumes[result['resume_id']]
             self.matching_engine.add_resume(
                 result['resume_id'],
@@ -37,11 +101,15 @@ class ResumeMatcher:
         
         return result
     
-    def find_matches(self, job_description: str, top_k: int = 5) -> List[Dict]:
-        return self.matching_engine.match_job_to_resumes(job_description, top_k)
+    def find_matches(self, job_description: str, top_k: int = 5, min_score: Optional[float] = None,
+                     exclude_ids: Optional[Iterable[str]] = None,
+                     section_weights: Optional[Dict[str, float]] = DEFAULT_SECTION_WEIGHTS) -> List[Dict]:
+        return self.matching_engine.match_job_to_resumes(job_description, top_k, min_score=min_score, exclude_ids=exclude_ids,
+                                                         section_weights=section_weights)
     
-    def match_single_resume(self, resume_id: str, job_description: str) -> Optional[Dict]:
-        return self.matching_engine.match_single_resume(resume_id, job_description)
+    def match_single_resume(self, resume_id: str, job_description: str,
+                            section_weights: Optional[Dict[str, float]] = DEFAULT_SECTION_WEIGHTS) -> Optional[Dict]:
+        return self.matching_engine.match_single_resume(resume_id, job_description, section_weights)
     
     def get_resume_details(self, resume_id: str) -> Optional[Dict]:
         resume_info = self.processor.get_resume_info(resume_id)
@@ -55,21 +123,36 @@ class ResumeMatcher:
             'text_length': resume_info['text_length'],
             'sections': resume_info['sections'],
             'processed_at': resume_info.get('processed_at', 0),
-            'has_embedding': match_info is not None
+            'has_embedding': match_info is not None,
+            'trace': resume_info.get('trace')
         }
     
+    def get_slowest_ingests(self, top_k: int = 10, stage: Optional[str] = None) -> List[Dict]:
+        return self.processor.get_slowest_ingests(top_k, stage)
+    
     def get_all_resumes(self) -> List[Dict]:
         return self.processor.get_all_resumes()
     
     def remove_resume(self, resume_id: str) -> bool:
+        self.analytics_cache.pop(resume_id, None)
         processor_removed = self.processor.remove_resume(resume_id)
         engine_removed = self.matching_engine.remove_resume(resume_id)
         return processor_removed or engine_removed
     
     def clear_all(self):
+        self.analytics_cache.clear()
         self.processor.clear_all()
         self.matching_engine.clear_all()
     
+    def save_index(self, path: str):
+        self.embedding_system.save_index(path, {'resumes': self.processor.export_records()})
+    
+    def load_index(self, path: str):
+        self.clear_all()
+        extra = self.embedding_system.load_index(path)
+        self.processor.restore_records(extra.get('resumes', {}))
+        self._register_results([{'success': True, 'resume_id': resume_id} for resume_id in self.processor.processed_resumes])
+    
     def get_stats(self) -> Dict:
         processor_stats = self.processor.get_stats()
         engine_stats = self.matching_engine.get_stats()
@@ -77,6 +160,7 @@ class ResumeMatcher:
         return {
             'processor_stats': processor_stats,
             'engine_stats': engine_stats,
+            'shared_models': self.embedding_system.registry.get_stats(),
             'total_resumes': processor_stats['total_resumes']
         }
     
@@ -101,7 +185,22 @@ class ResumeMatcher:
             'matches': matches
         }
     
+    def _memoized(self, method: str, resume_id: str, args: Tuple, compute: Callable[[], Dict]) -> Dict:
+        key = (method, args)
+        resume_cache = self.analytics_cache.get(resume_id)
+        if resume_cache is not None and key in resume_cache:
+            return resume_cache[key]
+        
+        result = compute()
+        if 'error' not in result:
+            self.analytics_cache.setdefault(resume_id, {})[key] = result
+        return result
+    
     def analyze_skill_gap(self, resume_id: str, required_skills: List[str]) -> Dict:
+        return self._memoized('skill_gap', resume_id, tuple(required_skills),
+                              lambda: self._analyze_skill_gap(resume_id, required_skills))
+    
+    def _analyze_skill_gap(self, resume_id: str, required_skills: List[str]) -> Dict:
         resume_data = self.processor.get_resume_info(resume_id)
         if not resume_data or 'entities' not in resume_data:
             return {'error': 'Resume not found or no entities available'}
@@ -110,6 +209,9 @@ class ResumeMatcher:
         return self.analytics.analyze_skill_gap(candidate_skills, required_skills)
     
     def assess_experience_level(self, resume_id: str) -> Dict:
+        return self._memoized('experience_level', resume_id, (), lambda: self._assess_experience_level(resume_id))
+    
+    def _assess_experience_level(self, resume_id: str) -> Dict:
         resume_data = self.processor.get_resume_info(resume_id)
         if not resume_data or 'entities' not in resume_data:
             return {'error': 'Resume not found or no entities available'}
@@ -119,6 +221,10 @@ class ResumeMatcher:
         return self.analytics.assess_experience_level(resume_text, entities)
     
     def estimate_salary(self, resume_id: str, job_title: str, location: str = None) -> Dict:
+        return self._memoized('salary', resume_id, (job_title, location),
+                              lambda: self._estimate_salary(resume_id, job_title, location))
+    
+    def _estimate_salary(self, resume_id: str, job_title: str, location: str = None) -> Dict:
         resume_data = self.processor.get_resume_info(resume_id)
         if not resume_data or 'entities' not in resume_data:
             return {'error': 'Resume not found or no entities available'}
@@ -140,6 +246,12 @@ class ResumeMatcher:
     
     def generate_advanced_report(self, resume_id: str, job_requirements: Dict, 
                                job_title: str, location: str = None) -> Dict:
+        args = (json.dumps(job_requirements, sort_keys=True, default=str), job_title, location)
+        return self._memoized('advanced_report', resume_id, args,
+                              lambda: self._generate_advanced_report(resume_id, job_requirements, job_title, location))
+    
+    def _generate_advanced_report(self, resume_id: str, job_requirements: Dict,
+                                  job_title: str, location: str = None) -> Dict:
         resume_data = self.processor.get_resume_info(resume_id)
         if not resume_data or 'entities' not in resume_data:
             return {'error': 'Resume not found or no entities available'}
@@ -1,41 +1,135 @@
+import hashlib
 import os
 import uuid
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
 from .document_parser import DocumentParser
 from .embedding_system import EmbeddingSystem
+from .ingest_trace import IngestTrace
 from .ner_extractor import NERExtractor
 
+_worker_parser = None
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def file_content_hash(file_path: str) -> Optional[str]:
+    try:
+        with open(file_path, 'rb') as file:
+            return content_hash(file.read())
+    except OSError:
+        return None
+
+def _init_ingest_worker(parser: DocumentParser):
+    global _worker_parser
+    _worker_parser = parser
+
+def _source_label(source: Dict) -> Dict:
+    if 'data' in source:
+        return {'file_name': source['file_name']}
+    return {'file_path': source['file_path']}
+
+def _parse_source(source: Dict, parser: DocumentParser = None) -> Dict:
+    parser = parser or _worker_parser
+    trace = IngestTrace()
+    
+    if 'data' in source:
+        parsed = parser.parse_guarded(source['data'], os.path.splitext(source['file_name'])[1], trace)
+        processed_at = time.time()
+    else:
+        parsed = parser.parse_guarded(source['file_path'], trace=trace)
+        processed_at = os.path.getmtime(source['file_path']) if parsed['success'] else None
+    
+    if not parsed['success']:
+        return dict(_source_label(source), success=False, error=parsed['error'], reason=parsed['reason'], trace=trace)
+    
+    with trace.stage('sectioning'):
+        sections = parser.extract_sections(parsed['text'])
+    
+    return dict(
+        _source_label(source),
+        success=True,
+        text=parsed['text'],
+        sections=sections,
+        processed_at=processed_at,
+        trace=trace
+    )
+
+def _merge_record_metadata(entities: Dict, metadata: Dict) -> Dict:
+    entities = dict(entities)
+    
+    if metadata.get('skills'):
+        entities['skills'] = list(metadata['skills'])
+        entities['summary'] = dict(entities['summary'], total_skills=len(entities['skills']))
+    
+    location = metadata.get('location')
+    if location and location not in entities['work_experience']['locations']:
+        entities['work_experience'] = dict(
+            entities['work_experience'],
+            locations=[location] + entities['work_experience']['locations']
+        )
+    
+    if metadata.get('experience_years') is not None:
+        entities['experience_years'] = metadata['experience_years']
+    
+    return entities
+
 class ResumeProcessor:
-    def __init__(self):
-        self.parser = DocumentParser()
-        self.embedding_system = EmbeddingSystem()
-        self.ner_extractor = NERExtractor()
+    def __init__(self, embedding_system: Optional[EmbeddingSystem] = None, entity_cache_path: Optional[str] = None,
+                 ner_batch_size: int = 64, ner_n_process: Optional[int] = None, max_pages: Optional[int] = 5,
+                 page_workers: int = 0, parse_timeout: Optional[float] = 30.0,
+                 parse_memory_limit_mb: Optional[int] = 1024):
+        self.parser = DocumentParser(max_pages=max_pages, page_workers=page_workers, timeout=parse_timeout,
+                                     memory_limit_mb=parse_memory_limit_mb)
+        self.embedding_system = embedding_system or EmbeddingSystem()
+        self.ner_extractor = NERExtractor(batch_size=ner_batch_size, n_process=ner_n_process, cache_path=entity_cache_path)
         self.processed_resumes = {}
+        self.content_index = {}
+        self.failed_index = {}
     
     def process_resume_file(self, file_path: str) -> Dict:
-        success, result = self.parser.parse_document(file_path)
+        trace = IngestTrace()
+        with trace.stage('hash'):
+            content_hash = file_content_hash(file_path)
+        existing_id = self.content_index.get(content_hash) if content_hash else None
+        if existing_id:
+            return dict(self._duplicate_result(existing_id), file_path=file_path)
+        if content_hash in self.failed_index:
+            return dict(self.failed_index[content_hash], file_path=file_path)
         
-        if not success:
-            return {
+        parsed = self.parser.parse_guarded(file_path, trace=trace)
+        
+        if not parsed['success']:
+            failure = {
                 'success': False,
-                'error': result,
+                'error': parsed['error'],
+                'reason': parsed['reason'],
                 'resume_id': None
             }
+            if content_hash:
+                self.failed_index[content_hash] = failure
+            return dict(failure, trace=trace.to_dict())
         
+        result = parsed['text']
         resume_id = str(uuid.uuid4())
-        sections = self.parser.extract_sections(result)
-        entities = self.ner_extractor.get_structured_entities(result)
+        with trace.stage('sectioning'):
+            sections = self.parser.extract_sections(result)
+        entities = self.ner_extractor.get_structured_entities(result, trace)
         
-        self.embedding_system.store_resume_embedding(resume_id, result, sections)
+        self.embedding_system.store_resume_embeddings([(resume_id, result, sections)], [trace])
         
         self.processed_resumes[resume_id] = {
             'file_path': file_path,
             'text': result,
             'sections': sections,
             'entities': entities,
-            'processed_at': os.path.getmtime(file_path)
+            'processed_at': os.path.getmtime(file_path),
+            'content_hash': content_hash,
+            'trace': trace.to_dict()
         }
+        if content_hash:
+            self.content_index[content_hash] = resume_id
         
         return {
             'success': True,
@@ -45,19 +139,252 @@ class ResumeProcessor:
             'file_path': file_path
         }
     
+    def process_resume_files(self, file_paths: List[str], max_workers: Optional[int] = None,
+                             progress_callback: Optional[Callable[[int, int, Dict], None]] = None) -> List[Dict]:
+        sources = [{'file_path': file_path} for file_path in file_paths]
+        return self._process_sources(sources, max_workers, progress_callback)
+    
+    def process_resume_bytes(self, data: bytes, file_name: str) -> Dict:
+        return self.process_resume_uploads([(file_name, data)])[0]
+    
+    def process_resume_uploads(self, uploads: List[Tuple[str, bytes]], max_workers: Optional[int] = None,
+                               progress_callback: Optional[Callable[[int, int, Dict], None]] = None) -> List[Dict]:
+        sources = [{'file_name': file_name, 'data': data} for file_name, data in uploads]
+        return self._process_sources(sources, max_workers, progress_callback)
+    
+    def _process_sources(self, sources: List[Dict], max_workers: Optional[int] = None,
+                         progress_callback: Optional[Callable[[int, int, Dict], None]] = None) -> List[Dict]:
+        total = len(sources)
+        parsed = {}
+        completed = 0
+        
+        def report(source: Dict, success: bool, error: Optional[str] = None):
+            nonlocal completed
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, total, dict(_source_label(source), success=success, error=error))
+        
+        content_hashes = []
+        hash_seconds = []
+        for source in sources:
+            started = time.perf_counter()
+            content_hashes.append(content_hash(source['data']) if 'data' in source else file_content_hash(source['file_path']))
+            hash_seconds.append(time.perf_counter() - started)
+        
+        first_positions = {}
+        to_parse = []
+        for position, source_hash in enumerate(content_hashes):
+            failure = self.failed_index.get(source_hash)
+            if failure:
+                report(sources[position], False, failure['error'])
+                continue
+            if source_hash in self.content_index or source_hash in first_positions:
+                report(sources[position], True)
+                continue
+            if source_hash:
+                first_positions[source_hash] = position
+            to_parse.append(position)
+        
+        def record(position: int, parsed_source: Dict):
+            parsed[position] = parsed_source
+            report(sources[position], parsed_source['success'], parsed_source.get('error'))
+        
+        if len(to_parse) <= 1 or max_workers == 1:
+            for position in to_parse:
+                record(position, _parse_source(sources[position], self.parser))
+        else:
+            if self.parser.isolated:
+                executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+                submit = lambda source: executor.submit(_parse_source, source, self.parser)
+            else:
+                executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_ingest_worker,
+                                               initargs=(self.parser,))
+                submit = lambda source: executor.submit(_parse_source, source)
+            
+            with executor:
+                futures = {submit(sources[position]): position for position in to_parse}
+                for future in as_completed(futures):
+                    position = futures[future]
+                    try:
+                        parsed_source = future.result()
+                    except Exception as e:
+                        parsed_source = dict(_source_label(sources[position]), success=False,
+                                             error=f"Error processing document: {str(e)}", reason='crashed',
+                                             trace=IngestTrace())
+                    record(position, parsed_source)
+        
+        for position in to_parse:
+            parsed[position]['trace'].record('hash', hash_seconds[position])
+        
+        succeeded = [position for position in to_parse if parsed[position]['success']]
+        parsed_entities = iter(self.ner_extractor.get_structured_entities_batch(
+            [parsed[position]['text'] for position in succeeded],
+            n_process=max_workers or self.ner_extractor.n_process,
+            traces=[parsed[position]['trace'] for position in succeeded]
+        ))
+        
+        ready = []
+        traces = []
+        results = []
+        for position, source in enumerate(sources):
+            label = _source_label(source)
+            source_hash = content_hashes[position]
+            parsed_source = parsed.get(position)
+            
+            if parsed_source is None:
+                existing_id = self.content_index.get(source_hash)
+                if source_hash in self.failed_index:
+                    results.append(dict(self.failed_index[source_hash], **label))
+                elif existing_id:
+                    results.append(dict(self._duplicate_result(existing_id), **label))
+                else:
+                    results.append(dict(results[first_positions[source_hash]], **label))
+                continue
+            
+            if not parsed_source['success']:
+                failure = {
+                    'success': False,
+                    'error': parsed_source['error'],
+                    'reason': parsed_source.get('reason'),
+                    'resume_id': None
+                }
+                if source_hash:
+                    self.failed_index[source_hash] = failure
+                results.append(dict(failure, trace=parsed_source['trace'].to_dict(), **label))
+                continue
+            
+            resume_id = str(uuid.uuid4())
+            ready.append((resume_id, parsed_source['text'], parsed_source['sections']))
+            traces.append(parsed_source['trace'])
+            self.processed_resumes[resume_id] = dict(label, **{
+                'text': parsed_source['text'],
+                'sections': parsed_source['sections'],
+                'entities': next(parsed_entities),
+                'processed_at': parsed_source['processed_at'],
+                'content_hash': source_hash
+            })
+            if source_hash:
+                self.content_index[source_hash] = resume_id
+            
+            results.append(dict({
+                'success': True,
+                'resume_id': resume_id,
+                'text_length': len(parsed_source['text']),
+                'sections': list(parsed_source['sections'].keys())
+            }, **label))
+        
+        self.embedding_system.store_resume_embeddings(ready, traces)
+        for (resume_id, _, _), trace in zip(ready, traces):
+            self.processed_resumes[resume_id]['trace'] = trace.to_dict()
+        
+        return results
+    
+    def find_resume_by_content(self, data: bytes) -> Optional[str]:
+        return self.content_index.get(content_hash(data))
+    
+    def find_failure_by_content(self, data: bytes) -> Optional[Dict]:
+        return self.failed_index.get(content_hash(data))
+    
+    def _duplicate_result(self, resume_id: str) -> Dict:
+        resume_data = self.processed_resumes[resume_id]
+        return {
+            'success': True,
+            'resume_id': resume_id,
+            'duplicate': True,
+            'text_length': len(resume_data['text']),
+            'sections': list(resume_data['sections'].keys())
+        }
+    
+    def process_resume_records(self, records: List[Dict]) -> List[Dict]:
+        results = []
+        accepted = []
+        duplicates = []
+        batch_ids = set()
+        for record in records:
+            record_hash = content_hash(record['text'].encode('utf-8'))
+            resume_id = record.get('resume_id')
+            
+            if resume_id:
+                existing = self.processed_resumes.get(resume_id)
+                unchanged = (existing is not None and existing.get('content_hash') == record_hash
+                             and existing.get('metadata') == (record.get('metadata') or {}))
+                if unchanged or resume_id in batch_ids:
+                    duplicates.append((len(results), resume_id))
+                    results.append(None)
+                    continue
+                
+                if existing is not None and self.content_index.get(existing.get('content_hash')) == resume_id:
+                    del self.content_index[existing['content_hash']]
+                self.content_index.setdefault(record_hash, resume_id)
+            else:
+                existing_id = self.content_index.get(record_hash)
+                if existing_id:
+                    duplicates.append((len(results), existing_id))
+                    results.append(None)
+                    continue
+                
+                resume_id = str(uuid.uuid4())
+                self.content_index[record_hash] = resume_id
+            
+            batch_ids.add(resume_id)
+            accepted.append((len(results), resume_id, record, record_hash))
+            results.append(None)
+        
+        texts = [record['text'] for _, _, record, _ in accepted]
+        traces = [IngestTrace() for _ in accepted]
+        parsed_sections = []
+        for text, trace in zip(texts, traces):
+            with trace.stage('sectioning'):
+                parsed_sections.append(self.parser.extract_sections(text))
+        parsed_entities = self.ner_extractor.get_structured_entities_batch(texts, traces=traces)
+        processed_at = time.time()
+        
+        ready = []
+        for (position, resume_id, record, record_hash), sections, entities in zip(accepted, parsed_sections, parsed_entities):
+            metadata = record.get('metadata') or {}
+            updated = resume_id in self.processed_resumes
+            ready.append((resume_id, record['text'], sections))
+            self.processed_resumes[resume_id] = {
+                'text': record['text'],
+                'sections': sections,
+                'entities': _merge_record_metadata(entities, metadata),
+                'metadata': metadata,
+                'processed_at': processed_at,
+                'content_hash': record_hash
+            }
+            results[position] = {
+                'success': True,
+                'resume_id': resume_id,
+                'updated': updated,
+                'text_length': len(record['text']),
+                'sections': list(sections.keys())
+            }
+        
+        for position, existing_id in duplicates:
+            results[position] = self._duplicate_result(existing_id)
+        
+        self.embedding_system.store_resume_embeddings(ready, traces)
+        for (resume_id, _, _), trace in zip(ready, traces):
+            self.processed_resumes[resume_id]['trace'] = trace.to_dict()
+        
+        return results
+    
     def process_resume_text(self, text: str, resume_id: str = None) -> Dict:
         if not resume_id:
             resume_id = str(uuid.uuid4())
         
-        sections = self.parser.extract_sections(text)
-        entities = self.ner_extractor.get_structured_entities(text)
-        self.embedding_system.store_resume_embedding(resume_id, text, sections)
+        trace = IngestTrace()
+        with trace.stage('sectioning'):
+            sections = self.parser.extract_sections(text)
+        entities = self.ner_extractor.get_structured_entities(text, trace)
+        self.embedding_system.store_resume_embeddings([(resume_id, text, sections)], [trace])
         
         self.processed_resumes[resume_id] = {
             'text': text,
             'sections': sections,
             'entities': entities,
-            'processed_at': time.time()
+            'processed_at': time.time(),
+            'trace': trace.to_dict()
         }
         
         return {
@@ -99,19 +426,13 @@ class ResumeProcessor:
         if not self.processed_resumes:
             return []
         
-        resume_texts = []
-        resume_ids = []
-        
-        for resume_id, resume_data in self.processed_resumes.items():
-            resume_texts.append(resume_data['text'])
-            resume_ids.append(resume_id)
-        
-        top_matches = self.embedding_system.find_top_matches(job_description, resume_texts, top_k)
+        top_matches = self.embedding_system.find_top_resumes(job_description, top_k)
         
         results = []
-        for idx, score in top_matches:
-            resume_id = resume_ids[idx]
-            resume_data = self.processed_resumes[resume_id]
+        for resume_id, score in top_matches:
+            resume_data = self.processed_resumes.get(resume_id)
+            if resume_data is None:
+                continue
             
             results.append({
                 'resume_id': resume_id,
@@ -130,9 +451,10 @@ class ResumeProcessor:
         return {
             'resume_id': resume_id,
             'text_length': len(resume_data['text']),
-            'sections': resume_data['sections'],
+            'sections': dict(resume_data['sections']),
             'entities': resume_data.get('entities', {}),
-            'processed_at': resume_data.get('processed_at', 0)
+            'processed_at': resume_data.get('processed_at', 0),
+            'trace': resume_data.get('trace')
         }
     
     def get_all_resumes(self) -> List[Dict]:
@@ -149,14 +471,50 @@ class ResumeProcessor:
     
     def remove_resume(self, resume_id: str) -> bool:
         if resume_id in self.processed_resumes:
-            del self.processed_resumes[resume_id]
+            resume_data = self.processed_resumes.pop(resume_id)
+            if self.content_index.get(resume_data.get('content_hash')) == resume_id:
+                del self.content_index[resume_data['content_hash']]
+            self.embedding_system.remove_resume_embedding(resume_id)
             return True
         return False
     
     def clear_all(self):
         self.processed_resumes.clear()
+        self.content_index.clear()
+        self.failed_index.clear()
         self.embedding_system.clear_cache()
     
+    def export_records(self) -> Dict[str, Dict]:
+        return {resume_id: {key: value for key, value in resume_data.items() if key != 'sections'}
+                for resume_id, resume_data in self.processed_resumes.items()}
+    
+    def restore_records(self, records: Dict[str, Dict]):
+        for resume_id, resume_data in records.items():
+            self.processed_resumes[resume_id] = dict(resume_data, sections=self.parser.extract_sections(resume_data['text']))
+            if resume_data.get('content_hash'):
+                self.content_index.setdefault(resume_data['content_hash'], resume_id)
+    
+    def get_slowest_ingests(self, top_k: int = 10, stage: Optional[str] = None) -> List[Dict]:
+        traced = [(resume_id, resume_data['trace']) for resume_id, resume_data in self.processed_resumes.items()
+                  if resume_data.get('trace')]
+        
+        if stage:
+            duration = lambda trace: trace['stages_ms'].get(stage, 0.0)
+        else:
+            duration = lambda trace: trace['total_ms']
+        
+        traced.sort(key=lambda item: duration(item[1]), reverse=True)
+        
+        results = []
+        for resume_id, trace in traced[:top_k]:
+            resume_data = self.processed_resumes[resume_id]
+            results.append({
+                'resume_id': resume_id,
+                'source': resume_data.get('file_name') or resume_data.get('file_path'),
+                'trace': trace
+            })
+        return results
+    
     def get_stats(self) -> Dict:
         total_skills = 0
         total_companies = 0
@@ -0,0 +1,45 @@
+import csv
+import os
+from spacy.matcher import PhraseMatcher
+from typing import Dict, List, Tuple
+
+DEFAULT_SKILL_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), 'data', 'skill_taxonomy.csv')
+
+def load_skill_taxonomy(path: str = DEFAULT_SKILL_TAXONOMY_PATH) -> Dict[str, Tuple[List[str], bool]]:
+    taxonomy = {}
+    with open(path, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            skill = row['skill'].strip()
+            if not skill:
+                continue
+            
+            aliases = [alias.strip() for alias in (row.get('aliases') or '').split('|') if alias.strip()]
+            case_sensitive = (row.get('case_sensitive') or '').strip().lower() in ('true', '1', 'yes')
+            taxonomy[skill] = (aliases, case_sensitive)
+    
+    return taxonomy
+
+class SkillMatcher:
+    def __init__(self, nlp, taxonomy_path: str = DEFAULT_SKILL_TAXONOMY_PATH):
+        self.taxonomy_path = taxonomy_path
+        self.taxonomy = load_skill_taxonomy(taxonomy_path)
+        self.exact_matcher = PhraseMatcher(nlp.vocab, attr='ORTH')
+        self.lower_matcher = PhraseMatcher(nlp.vocab, attr='LOWER')
+        
+        for skill, (aliases, case_sensitive) in self.taxonomy.items():
+            if case_sensitive:
+                self.exact_matcher.add(skill, [nlp.make_doc(skill)])
+            else:
+                aliases = [skill] + aliases
+            
+            if aliases:
+                self.lower_matcher.add(skill, list(nlp.tokenizer.pipe(alias.lower() for alias in aliases)))
+    
+    def __len__(self) -> int:
+        return len(self.taxonomy)
+    
+    def match(self, doc) -> List[str]:
+        strings = doc.vocab.strings
+        skills = {strings[match_id] for match_id, _, _ in self.exact_matcher(doc)}
+        skills.update(strings[match_id] for match_id, _, _ in self.lower_matcher(doc))
+        return sorted(skills)
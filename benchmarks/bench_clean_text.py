@@ -0,0 +1,64 @@
+import argparse
+import csv
+import glob
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.document_parser import DocumentParser
+
+def legacy_clean_text(text: str) -> str:
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)]', '', text)
+    return text.strip()
+
+def load_dataset_texts(datasets_dir: str) -> list:
+    texts = []
+    for path in sorted(glob.glob(os.path.join(datasets_dir, '*.csv'))):
+        with open(path, newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                text = row.get('text') or row.get('description')
+                if text:
+                    texts.append(text)
+    return texts
+
+def as_extracted_layout(text: str, width: int = 70) -> str:
+    lines = [text[start:start + width] for start in range(0, len(text), width)]
+    return '\n'.join('  • ' + line.replace(', ', ' • ') + ' ' for line in lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the single-pass text cleaner with the previous two-pass version.')
+    parser.add_argument('--datasets', default=os.path.join(ROOT, 'datasets'))
+    parser.add_argument('--scale', type=int, default=50, help='How many times to replicate the dataset texts')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    texts = load_dataset_texts(args.datasets)
+    corpora = {
+        'raw': texts * args.scale,
+        'extracted_layout': [as_extracted_layout(text) for text in texts] * args.scale
+    }
+
+    document_parser = DocumentParser()
+    implementations = {
+        'legacy_two_pass': legacy_clean_text,
+        'single_pass': document_parser._clean_text
+    }
+
+    for corpus_name, corpus in corpora.items():
+        total_chars = sum(len(text) for text in corpus)
+        print(f"{corpus_name}: {len(corpus)} texts, {total_chars} characters")
+
+        timings = {}
+        for name, clean in implementations.items():
+            timings[name] = min(timeit.repeat(lambda: [clean(text) for text in corpus], number=1, repeat=args.repeat))
+            print(f"  {name:<16} {timings[name] * 1000:9.2f} ms  {total_chars / timings[name] / 1e6:8.2f} MB/s")
+
+        print(f"  speedup          {timings['legacy_two_pass'] / timings['single_pass']:9.2f}x")
+
+if __name__ == '__main__':
+    main()
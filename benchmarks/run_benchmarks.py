@@ -0,0 +1,263 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import docx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.advanced_analytics import AdvancedAnalytics
+from app.ann_index import IVFIndex
+from app.dataset_loader import iter_csv_rows, split_list_field
+from app.document_parser import DocumentParser
+from app.embedding_index import EmbeddingIndex
+from app.embedding_system import EmbeddingSystem
+from app.matching_engine import MatchingEngine
+from app.ner_extractor import NERExtractor
+
+FIRST_NAMES = ['Alex', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn', 'Skyler']
+LAST_NAMES = ['Smith', 'Johnson', 'Lee', 'Garcia', 'Chen', 'Patel', 'Kim', 'Nguyen', 'Brown', 'Lopez']
+DUTIES = [
+    'Led a team of {n} engineers delivering {skill} services.',
+    'Built data pipelines with {skill} processing {n} million records per day.',
+    'Reduced latency by {n}% by rewriting core components in {skill}.',
+    'Mentored {n} junior developers and introduced {skill} best practices.',
+    'Designed and shipped {n} customer-facing features using {skill}.'
+]
+
+def load_seed_rows(datasets_dir: str):
+    resumes = []
+    jobs = []
+    for path in sorted(glob.glob(os.path.join(datasets_dir, '*.csv'))):
+        for row in iter_csv_rows(path):
+            if row.get('text'):
+                resumes.append(row)
+            elif row.get('description'):
+                jobs.append(row)
+    return resumes, jobs
+
+def synthetic_resume(rng: random.Random, resumes, jobs) -> str:
+    seed = rng.choice(resumes)
+    job = rng.choice(jobs)
+    skills = split_list_field(seed.get('skills')) + split_list_field(job.get('skills_required'))
+    skills = rng.sample(skills, min(len(skills), rng.randint(4, 10))) or ['Python']
+    end_year = rng.randint(2015, 2024)
+    start_year = end_year - rng.randint(1, 8)
+    duties = [rng.choice(DUTIES).format(n=rng.randint(2, 40), skill=rng.choice(skills)) for _ in range(rng.randint(2, 5))]
+
+    return '\n'.join([
+        f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        seed.get('location') or job.get('location') or 'Remote',
+        '',
+        'SUMMARY',
+        seed['text'],
+        '',
+        'EXPERIENCE',
+        f"{job['title']} at {job['company']} ({start_year} - {end_year})",
+        *duties,
+        '',
+        'SKILLS',
+        ', '.join(skills),
+        '',
+        'EDUCATION',
+        seed.get('education') or 'Bachelor in Computer Science'
+    ])
+
+def synthetic_job(rng: random.Random, jobs) -> str:
+    seed = rng.choice(jobs)
+    skills = split_list_field(seed.get('skills_required'))
+    rng.shuffle(skills)
+    return (f"{seed['title']} at {seed['company']} in {seed.get('location') or 'Remote'}. "
+            f"{seed['description']} Required skills: {', '.join(skills)}.")
+
+def generate_corpus(size: int, resumes, jobs, seed: int):
+    rng = random.Random(seed + size)
+    return ([synthetic_resume(rng, resumes, jobs) for _ in range(size)],
+            [synthetic_job(rng, jobs) for _ in range(size)])
+
+def summarize(latencies, items=None) -> dict:
+    latencies = np.asarray(latencies, dtype=np.float64)
+    total = float(latencies.sum())
+    items = len(latencies) if items is None else items
+    return {
+        'count': int(len(latencies)),
+        'items': int(items),
+        'total_seconds': round(total, 6),
+        'throughput_per_second': round(items / total, 3) if total else None,
+        'mean_ms': round(float(latencies.mean()) * 1000, 4),
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 4),
+        'p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 4),
+        'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 4)
+    }
+
+def timed(call, inputs):
+    latencies = []
+    for item in inputs:
+        start = time.perf_counter()
+        call(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def bench_parse(texts, directory: str) -> dict:
+    paths = []
+    for position, text in enumerate(texts):
+        document = docx.Document()
+        for line in text.split('\n'):
+            document.add_paragraph(line)
+        path = os.path.join(directory, f"resume_{position}.docx")
+        document.save(path)
+        paths.append(path)
+
+    parser = DocumentParser()
+    return summarize(timed(parser.parse_document, paths))
+
+def bench_ner(texts) -> dict:
+    extractor = NERExtractor()
+    extractor.get_structured_entities(texts[0])
+    return summarize(timed(extractor.get_structured_entities, texts))
+
+def bench_encode(embedding_system: EmbeddingSystem, texts, batch_size: int) -> dict:
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    return summarize(timed(embedding_system.get_embeddings_batch, batches), items=len(texts))
+
+def bench_ingest(engine: MatchingEngine, resume_texts, batch_size: int) -> dict:
+    parser = DocumentParser()
+    ids = [f"resume-{position}" for position in range(len(resume_texts))]
+    sections = [parser.extract_sections(text) for text in resume_texts]
+    latencies = []
+
+    for start in range(0, len(resume_texts), batch_size):
+        begin = time.perf_counter()
+        batch = list(zip(ids[start:start + batch_size], resume_texts[start:start + batch_size], sections[start:start + batch_size]))
+        engine.embedding_system.store_resume_embeddings(batch)
+        for resume_id, text, resume_sections in batch:
+            engine.add_resume(resume_id, text, resume_sections)
+        latencies.append(time.perf_counter() - begin)
+
+    return summarize(latencies, items=len(resume_texts))
+
+def bench_match(engine: MatchingEngine, queries, top_k: int) -> dict:
+    engine.embedding_system.get_embeddings_batch(queries)
+    return summarize(timed(lambda query: engine.match_job_to_resumes(query, top_k), queries))
+
+def bench_ann(engine: MatchingEngine, queries, top_k: int, nlist: int, nprobe: int) -> dict:
+    exact_index = engine.embedding_system.index
+    ann_index = EmbeddingIndex(ann=IVFIndex(nlist=nlist, nprobe=nprobe, train_threshold=len(exact_index)))
+    for item_id, vector in zip(exact_index.ids, exact_index.vectors()):
+        ann_index.add(item_id, vector)
+
+    query_vectors = engine.embedding_system.get_embeddings_batch(queries)
+    stats = summarize(timed(lambda query_vector: ann_index.search(query_vector, top_k), query_vectors))
+    stats.update(ann_index.recall_report(query_vectors, top_k))
+    return stats
+
+def bench_analytics(resume_texts, queries, rng: random.Random) -> dict:
+    analytics = AdvancedAnalytics()
+    extractor = NERExtractor()
+    entities = extractor.get_structured_entities_batch(resume_texts)
+    cases = [(text, entity, rng.choice(queries)) for text, entity in zip(resume_texts, entities)]
+
+    def run(case):
+        text, entity, query = case
+        experience = analytics.assess_experience_level(text, entity)
+        analytics.estimate_salary('Software Engineer', experience['overall_level'], 'San Francisco', entity['skills'], entity)
+        analytics.analyze_skill_gap(entity['skills'], query.split('Required skills: ')[-1].rstrip('.').split(', '))
+
+    return summarize(timed(run, cases))
+
+def compare(current: dict, baseline_path: str):
+    with open(baseline_path, encoding='utf-8') as file:
+        baseline = json.load(file)
+
+    print(f"\nComparison with {baseline_path} (p50 ratio, lower is faster)")
+    for size, stages in current['results'].items():
+        for stage, stats in stages.items():
+            previous = baseline.get('results', {}).get(size, {}).get(stage)
+            if previous and previous['p50_ms']:
+                print(f"  {size:>7} {stage:<10} {stats['p50_ms'] / previous['p50_ms']:8.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ingest and ranking on synthetic corpora built from the bundled datasets.')
+    parser.add_argument('--datasets', default=os.path.join(ROOT, 'datasets'))
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated corpus sizes')
+    parser.add_argument('--stages', default='parse,ner,encode,ingest,match,ann,analytics')
+    parser.add_argument('--parse-sample', type=int, default=500, help='Documents per size written to DOCX and parsed')
+    parser.add_argument('--ner-sample', type=int, default=2000, help='Documents per size sent through spaCy')
+    parser.add_argument('--analytics-sample', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--nlist', type=int, default=1024, help='IVF partitions for the ann stage')
+    parser.add_argument('--nprobe', type=int, default=16, help='IVF partitions probed per query in the ann stage')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--seed', type=int, default=13)
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results',
+                                                         f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"))
+    parser.add_argument('--baseline', help='Previous JSON result to compare against')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    stages = set(args.stages.split(','))
+    resumes, jobs = load_seed_rows(args.datasets)
+
+    report = {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'model': args.model,
+            'seed': args.seed,
+            'arguments': vars(args)
+        },
+        'results': {}
+    }
+
+    for size in sizes:
+        resume_texts, job_texts = generate_corpus(size, resumes, jobs, args.seed)
+        queries = job_texts[:args.queries]
+        results = report['results'][str(size)] = {}
+        print(f"corpus {size}: {len(resume_texts)} resumes, {len(job_texts)} jobs")
+
+        if 'parse' in stages:
+            with tempfile.TemporaryDirectory() as directory:
+                results['parse'] = bench_parse(resume_texts[:args.parse_sample], directory)
+        if 'ner' in stages:
+            results['ner'] = bench_ner(resume_texts[:args.ner_sample])
+
+        if 'encode' in stages:
+            results['encode'] = bench_encode(EmbeddingSystem(args.model, batch_size=args.batch_size), resume_texts, args.batch_size)
+        engine = MatchingEngine(EmbeddingSystem(args.model, batch_size=args.batch_size))
+        if stages & {'ingest', 'match', 'ann'}:
+            results['ingest'] = bench_ingest(engine, resume_texts, args.batch_size)
+        if 'match' in stages:
+            results['match'] = bench_match(engine, queries, args.top_k)
+        if 'ann' in stages:
+            results['ann'] = bench_ann(engine, queries, args.top_k, args.nlist, args.nprobe)
+        if 'analytics' in stages:
+            results['analytics'] = bench_analytics(resume_texts[:args.analytics_sample], queries, random.Random(args.seed))
+
+        for stage, stats in results.items():
+            recall = f"  recall@{args.top_k} {stats['recall']:.3f}" if 'recall' in stats else ''
+            print(f"  {stage:<10} {stats['throughput_per_second'] or 0:12.1f}/s  "
+                  f"p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  p99 {stats['p99_ms']:9.3f} ms{recall}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.baseline:
+        compare(report, args.baseline)
+
+if __name__ == '__main__':
+    main()